@@ -0,0 +1,7 @@
+-- Composite index for findByRecordingAndType: covers both the WHERE filter
+-- (recording_id, type) and the ORDER BY (timestamp ASC), eliminating the temp
+-- B-tree sort. It also serves every lookup idx_obs_recording_type did.
+DROP INDEX IF EXISTS idx_obs_recording_type;
+CREATE INDEX IF NOT EXISTS idx_obs_recording_type_time ON observations(recording_id, type, timestamp);
+
+PRAGMA user_version = 25;
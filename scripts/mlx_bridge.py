@@ -18,13 +18,18 @@ Environment Variables:
 """
 
 import argparse
+import atexit
+import functools
 import json
 import os
 import re
+import selectors
 import signal
 import socket
 import sys
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Literal, TextIO
@@ -34,6 +39,30 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     setproctitle = None
 
+try:
+    import cv2  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    cv2 = None
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# NDJSON codec: orjson when available (encodes straight to bytes), stdlib otherwise.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type.
+if orjson is not None:
+    def encode_json(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    decode_json = orjson.loads
+else:
+    def encode_json(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    decode_json = json.loads
+
 
 class InferenceTimeout(Exception):
     pass
@@ -82,13 +111,27 @@ def find_project_root() -> Path:
 # Global state
 model = None
 processor = None
-config = None
 llm_model = None
 llm_tokenizer = None
 llm_loaded_model_name = None
 server_socket: socket.socket | None = None
 LOG_DEST: TextIO | None = None
 
+# mlx_vlm entry points, resolved once by load_model() so the per-batch path
+# does no imports. LLM-only mode never loads mlx_vlm.
+vlm_generate: Any = None
+get_chat_template: Any = None
+
+# mlx_lm entry points, resolved once by load_llm_model().
+llm_generate: Any = None
+make_sampler: Any = None
+
+# Next-batch image prefetch (queue depth 1): decoded while the current
+# batch is in generate(), handed over when the matching request arrives.
+prefetch_executor: ThreadPoolExecutor | None = None
+prefetch_paths: tuple[str, ...] = ()
+prefetch_future: Future | None = None
+
 
 def rotate_log(path: Path) -> None:
     """Rotate log file when it exceeds max size (default 10MB)."""
@@ -123,38 +166,87 @@ def ensure_log_destination() -> None:
 ensure_log_destination()
 
 
+# Buffered log writer: log() appends to pending_log_lines and a background
+# thread writes them out in one batch every LOG_FLUSH_INTERVAL_S. Errors and
+# cleanup() flush synchronously. RLock because signal handlers log too.
+LOG_FLUSH_INTERVAL_S = 0.05
+log_lock = threading.RLock()
+log_pending = threading.Event()
+pending_log_lines: list[str] = []
+log_writer: threading.Thread | None = None
+
+
+def flush_logs() -> None:
+    """Write out all pending log lines."""
+    global pending_log_lines
+    with log_lock:
+        if not pending_log_lines:
+            return
+        lines, pending_log_lines = pending_log_lines, []
+        dest = LOG_DEST or sys.stderr
+        try:
+            dest.write("\n".join(lines) + "\n")
+            dest.flush()
+        except (OSError, ValueError):
+            pass
+
+
+def log_writer_loop() -> None:
+    while True:
+        log_pending.wait()
+        time.sleep(LOG_FLUSH_INTERVAL_S)  # coalesce a burst into one write
+        log_pending.clear()
+        flush_logs()
+
+
 def log(message: str, level: str = "info") -> None:
     """Log message with [MLX] prefix and timestamp."""
+    global log_writer
     if level == "debug" and not VERBOSE:
         return
     prefix = {"info": "[MLX]", "error": "[MLX] ERROR:", "debug": "[MLX] DEBUG:"}.get(
         level, "[MLX]"
     )
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    dest = LOG_DEST or sys.stderr
-    print(f"{timestamp} {prefix} {message}", file=dest, flush=True)
+    with log_lock:
+        pending_log_lines.append(f"{timestamp} {prefix} {message}")
+    if level == "error":
+        flush_logs()
+        return
+    if log_writer is None:
+        log_writer = threading.Thread(
+            target=log_writer_loop, name="log-writer", daemon=True
+        )
+        log_writer.start()
+        atexit.register(flush_logs)
+    log_pending.set()
 
 
 
 
 def load_llm_model(model_name: str) -> tuple[Any, Any]:
     """Load an MLX text-only LLM model via mlx_lm."""
+    global llm_generate, make_sampler
     log(f"Loading LLM model: {model_name}")
     log("This may take 30-120 seconds on first run or after memory clear...")
-    start = time.time()
+    start = time.perf_counter()
 
     try:
         import gc
         import mlx.core as mx
 
         log("Importing mlx_lm...", "debug")
-        from mlx_lm import load
+        from mlx_lm import generate, load
+        from mlx_lm.sample_utils import make_sampler as sampler_fn
         import mlx_lm
 
+        llm_generate = generate
+        make_sampler = sampler_fn
+
         log("Loading model weights into memory (this takes the longest)...", "debug")
         model_obj, tokenizer_obj = load(model_name)
 
-        duration = time.time() - start
+        duration = time.perf_counter() - start
         log(f"LLM model loaded in {duration:.1f}s")
         log(f"mlx_lm version: {mlx_lm.__version__}")
 
@@ -183,7 +275,7 @@ def load_llm_model(model_name: str) -> tuple[Any, Any]:
 
 def unload_vlm() -> None:
     """Free VLM memory before loading LLM."""
-    global model, processor, config
+    global model, processor
     log("Unloading VLM model to free memory", "debug")
     try:
         import gc
@@ -191,7 +283,7 @@ def unload_vlm() -> None:
 
         model = None
         processor = None
-        config = None
+        chat_template_cache.clear()
         gc.collect()
         mx.metal.clear_cache()  # Apple Silicon memory cleanup
         log("VLM unloaded successfully", "debug")
@@ -217,9 +309,58 @@ def unload_llm() -> None:
         log(f"Error unloading LLM: {e}", "error")
 
 
+def decode_images(image_paths: list[str]) -> list[Any]:
+    """Open and decode images to RGB so generate() can skip the disk read."""
+    from PIL import Image
+
+    images = []
+    for path in image_paths:
+        # OpenCV's libjpeg-turbo/SIMD decoders beat stock Pillow when present
+        pixels = cv2.imread(path, cv2.IMREAD_COLOR) if cv2 is not None else None
+        if pixels is not None:
+            images.append(Image.fromarray(cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB)))
+            continue
+        with Image.open(path) as img:
+            images.append(img.convert("RGB"))
+    return images
+
+
+def schedule_image_prefetch(image_paths: list[str]) -> None:
+    """Start decoding the next batch's images on the background worker."""
+    global prefetch_executor, prefetch_paths, prefetch_future
+    if not image_paths:
+        return
+    if prefetch_executor is None:
+        prefetch_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="image-prefetch"
+        )
+    prefetch_paths = tuple(image_paths)
+    prefetch_future = prefetch_executor.submit(decode_images, list(image_paths))
+
+
+def take_prefetched_images(image_paths: list[str]) -> list[Any] | None:
+    """Return prefetched images if they match image_paths, else None."""
+    global prefetch_paths, prefetch_future
+    future, paths = prefetch_future, prefetch_paths
+    prefetch_future, prefetch_paths = None, ()
+    if future is None:
+        return None
+    if paths != tuple(image_paths):
+        future.cancel()
+        return None
+    try:
+        return future.result()
+    except Exception as e:
+        log(f"Image prefetch failed, loading from paths: {e}", "debug")
+        return None
+
+
 def cleanup() -> None:
     """Clean up socket file on exit."""
     global server_socket
+    flush_logs()
+    if prefetch_executor is not None:
+        prefetch_executor.shutdown(wait=False, cancel_futures=True)
     if server_socket is not None:
         try:
             server_socket.close()
@@ -269,30 +410,36 @@ def resolve_model_path(model_name: str) -> tuple[str, str]:
     return model_name, "HuggingFace repo"
 
 
-def load_model() -> tuple[Any, Any, Any]:
+def load_model() -> tuple[Any, Any]:
     """Load MLX-VLM model."""
+    global vlm_generate, get_chat_template
     resolved_name, source_kind = resolve_model_path(MODEL_NAME)
     log(f"Loading model: {resolved_name}")
     log(f"Model source: {source_kind}")
     log(f"HF_HUB_OFFLINE: {os.environ.get('HF_HUB_OFFLINE', 'not set')}")
     log("This may take 30-120 seconds on first run or after memory clear...")
-    start = time.time()
+    start = time.perf_counter()
 
     try:
         log("Importing mlx_vlm...", "debug")
-        from mlx_vlm import load
-        from mlx_vlm.utils import load_config
+        import mlx.core as mx
+        from mlx_vlm import generate, load
+        from mlx_vlm.prompt_utils import get_chat_template as chat_template_fn
+
+        vlm_generate = generate
+        get_chat_template = chat_template_fn
 
         log("Loading model weights into memory (this takes the longest)...", "debug")
         model_obj, processor_obj = load(resolved_name)
+        # Weights load lazily; materialize them now instead of in the first batch
+        mx.eval(model_obj.parameters())
 
-        log("Loading model config...", "debug")
-        config_obj = load_config(resolved_name)
+        warm_up_model(model_obj, processor_obj)
 
-        duration = time.time() - start
+        duration = time.perf_counter() - start
         log(f"Model loaded in {duration:.1f}s ({source_kind})")
 
-        return model_obj, processor_obj, config_obj
+        return model_obj, processor_obj
     except ImportError as e:
         log(f"Failed to import mlx_vlm: {e}", "error")
         log(f"Python used: {sys.executable}", "error")
@@ -326,11 +473,39 @@ def load_model() -> tuple[Any, Any, Any]:
         sys.exit(1)
 
 
+def warm_up_model(model_obj: Any, processor_obj: Any) -> None:
+    """Run a 1-token generation so kernel setup happens before "ready"."""
+    try:
+        prompt = build_vlm_prompt(processor_obj, {"rawPrompt": "Reply with OK."})
+        vlm_generate(
+            model_obj, processor_obj, prompt, temperature=0.0, max_tokens=1, verbose=False
+        )
+    except Exception as e:
+        log(f"Warmup generation failed (continuing): {e}", "debug")
+
+
+SOCKET_BUFFER_BYTES = 1 << 20
+
+
+def send_parts(conn: socket.socket, parts: list[bytes]) -> None:
+    """Send parts with one sendmsg() per attempt, resuming after partial writes."""
+    if not hasattr(conn, "sendmsg"):
+        conn.sendall(b"".join(parts))
+        return
+    views = [memoryview(part) for part in parts]
+    while views:
+        sent = conn.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views and sent:
+            views[0] = views[0][sent:]
+
+
 def send_response(conn: socket.socket, obj: dict) -> None:
     """Send JSON response over socket."""
     try:
-        data = json.dumps(obj) + "\n"
-        conn.sendall(data.encode("utf-8"))
+        send_parts(conn, [encode_json(obj), b"\n"])
         log(
             f"Sent response: {obj.get('id', '?')} batch={obj.get('batch', '?')}",
             "debug",
@@ -339,10 +514,62 @@ def send_response(conn: socket.socket, obj: dict) -> None:
         log(f"Failed to send response: {e}", "error")
 
 
+# Rendered chat templates keyed by message shape (roles + content item types),
+# rendered with text items replaced by slot markers. Batches of the same size
+# only differ in their text, so later calls just fill the slots. None marks a
+# shape whose template rewrites text, which always gets a full render.
+chat_template_cache: dict[tuple, str | None] = {}
+TEMPLATE_SLOT = "\x00slot{}\x00"
+TEMPLATE_SLOT_PATTERN = re.compile(r"\x00slot(\d+)\x00")
+
+
+def template_shape(messages: list[dict]) -> tuple[tuple, list[str]]:
+    """Split messages into (shape key, slot texts) without copying them."""
+    shape = []
+    texts: list[str] = []
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            shape.append((msg.get("role"), None))
+            texts.append(content)
+            continue
+        items = []
+        for item in content or []:
+            item_type = item.get("type")
+            items.append(item_type)
+            if item_type == "text":
+                texts.append(item.get("text", ""))
+        shape.append((msg.get("role"), tuple(items)))
+    return tuple(shape), texts
+
+
+def slot_messages(messages: list[dict]) -> list[dict]:
+    """Copy messages with each text replaced by its numbered slot (cache misses only)."""
+    slot = 0
+    slotted = []
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            slotted.append({**msg, "content": TEMPLATE_SLOT.format(slot)})
+            slot += 1
+            continue
+        slotted_content = []
+        for item in content or []:
+            if item.get("type") == "text":
+                slotted_content.append({**item, "text": TEMPLATE_SLOT.format(slot)})
+                slot += 1
+            else:
+                slotted_content.append(item)
+        slotted.append({**msg, "content": slotted_content})
+    return slotted
+
+
+def fill_template(template: str, texts: list[str]) -> str:
+    return TEMPLATE_SLOT_PATTERN.sub(lambda m: texts[int(m.group(1))], template)
+
+
 def build_vlm_prompt(processor_obj: Any, prompt_params: dict) -> str | None:
     """Build a VLM prompt using the same template path as text_infer/vlm_infer."""
-    from mlx_vlm.prompt_utils import get_chat_template
-
     messages = prompt_params.get("messages", [])
     raw_prompt = prompt_params.get("rawPrompt")
 
@@ -352,7 +579,52 @@ def build_vlm_prompt(processor_obj: Any, prompt_params: dict) -> str | None:
     if not messages:
         return None
 
-    return get_chat_template(processor_obj, messages, add_generation_prompt=True)
+    shape, texts = template_shape(messages)
+    if shape in chat_template_cache:
+        template = chat_template_cache[shape]
+        if template is not None:
+            return fill_template(template, texts)
+        return get_chat_template(processor_obj, messages, add_generation_prompt=True)
+
+    prompt = get_chat_template(processor_obj, messages, add_generation_prompt=True)
+    template = get_chat_template(
+        processor_obj, slot_messages(messages), add_generation_prompt=True
+    )
+    # Only trust the slotted render if it reproduces the real one exactly
+    chat_template_cache[shape] = (
+        template if fill_template(template, texts) == prompt else None
+    )
+    return prompt
+
+
+def build_llm_prompt(tokenizer_obj: Any, prompt_params: dict) -> str | None:
+    """Render rawPrompt or messages through the LLM tokenizer's chat template."""
+    messages = prompt_params.get("messages", [])
+    raw_prompt = prompt_params.get("rawPrompt")
+    think_enabled = prompt_params.get("think", False)
+
+    if raw_prompt:
+        messages = [{"role": "user", "content": raw_prompt}]
+    if not messages:
+        return None
+
+    built_prompt = tokenizer_obj.apply_chat_template(
+        messages,
+        tokenize=False,
+        add_generation_prompt=True,
+        chat_template_kwargs={"enable_thinking": think_enabled},
+    )
+    log(
+        f"Applied chat template to {'raw prompt' if raw_prompt else 'messages'} (think={think_enabled})",
+        "debug",
+    )
+    return built_prompt
+
+
+@functools.lru_cache(maxsize=8)
+def llm_sampler(temperature: float) -> Any:
+    """Sampler for a temperature; requests reuse a handful of settings."""
+    return make_sampler(temp=temperature)
 
 
 def count_prompt_tokens(tokenizer_obj: Any, prompt_text: str) -> int:
@@ -396,7 +668,6 @@ def handle_text_prompt_fit(
     conn: socket.socket,
     model_obj: Any,
     processor_obj: Any,
-    config_obj: Any,
     params: dict,
     request_id: int,
 ) -> None:
@@ -435,10 +706,10 @@ def handle_text_prompt_fit(
             raise ValueError("VLM tokenizer unavailable")
 
         prompt_tokens = count_prompt_tokens(tokenizer, prompt)
+        model_config = getattr(model_obj, "config", None)
         context_limit = resolve_context_limit(
-            config_obj,
-            getattr(config_obj, "text_config", None),
-            getattr(model_obj, "config", None),
+            model_config,
+            getattr(model_config, "text_config", None),
             tokenizer,
             getattr(tokenizer, "tokenizer", None),
             fallback_context_limit=fallback_context_limit,
@@ -467,11 +738,43 @@ def handle_text_prompt_fit(
 
 
 
+def generation_text(output: Any) -> str:
+    """Text of a GenerationResult (mlx_vlm) or plain-string output (mlx_lm)."""
+    try:
+        return output.text
+    except AttributeError:
+        return output if isinstance(output, str) else str(output)
+
+
+def generation_stats(output: Any, generate_time: float) -> dict:
+    """Build the response stats dict from a GenerationResult."""
+    try:
+        return {
+            "prompt_tokens": output.prompt_tokens,
+            "generation_tokens": output.generation_tokens,
+            "total_tokens": output.total_tokens,
+            "prompt_tps": output.prompt_tps,
+            "generation_tps": output.generation_tps,
+            "peak_memory_gb": output.peak_memory,
+            "generate_time_s": generate_time,
+        }
+    except AttributeError:
+        # Plain-string output (mlx_lm) or a result type missing some fields
+        return {
+            "prompt_tokens": getattr(output, "prompt_tokens", 0),
+            "generation_tokens": getattr(output, "generation_tokens", 0),
+            "total_tokens": getattr(output, "total_tokens", 0),
+            "prompt_tps": getattr(output, "prompt_tps", 0.0),
+            "generation_tps": getattr(output, "generation_tps", 0.0),
+            "peak_memory_gb": getattr(output, "peak_memory", 0.0),
+            "generate_time_s": generate_time,
+        }
+
+
 def handle_vlm_infer(
     conn: socket.socket,
     model_obj: Any,
     processor_obj: Any,
-    config_obj: Any,
     params: dict,
     request_id: int,
 ) -> None:
@@ -481,15 +784,13 @@ def handle_vlm_infer(
     Input: params["messages"] - standard chat array with images
     Output: raw text string + stats
     """
-    from mlx_vlm import generate
-
-    global model, processor, config
+    global model, processor
 
     # Reload model if it was unloaded (lazy reload after unload_vlm)
     if model_obj is None:
         log("VLM model was unloaded, reloading...")
-        model, processor, config = load_model()
-        model_obj, processor_obj, config_obj = model, processor, config
+        model, processor = load_model()
+        model_obj, processor_obj = model, processor
 
     try:
         messages = params.get("messages", [])
@@ -506,7 +807,7 @@ def handle_vlm_infer(
         # Apply chat template
         prompt = build_vlm_prompt(processor_obj, {"messages": messages})
 
-        t_start = time.time()
+        t_start = time.perf_counter()
 
         # Generate - extract image paths from messages
         image_paths = []
@@ -516,14 +817,18 @@ def handle_vlm_infer(
                     if item.get("type") == "image" and "imagePath" in item:
                         image_paths.append(item["imagePath"])
 
+        images = take_prefetched_images(image_paths) if image_paths else None
+        # Decode the next batch while this one generates
+        schedule_image_prefetch(params.get("prefetchImagePaths") or [])
+
         signal.signal(signal.SIGALRM, timeout_handler)
         signal.alarm(300)  # 5 minutes
         try:
-            output = generate(
+            output = vlm_generate(
                 model_obj,
                 processor_obj,
                 prompt,
-                image=image_paths if image_paths else None,
+                image=images or image_paths or None,
                 temperature=TEMPERATURE,
                 max_tokens=max_tokens,
                 verbose=VERBOSE,
@@ -537,27 +842,13 @@ def handle_vlm_infer(
         finally:
             signal.alarm(0)
 
-        t_end = time.time()
+        t_end = time.perf_counter()
         generate_time = t_end - t_start
 
         # Extract text from output
-        if hasattr(output, "text"):
-            response_text = output.text
-        elif isinstance(output, str):
-            response_text = output
-        else:
-            response_text = str(output)
+        response_text = generation_text(output)
 
-        # Build stats dict from GenerationResult
-        stats = {
-            "prompt_tokens": getattr(output, "prompt_tokens", 0),
-            "generation_tokens": getattr(output, "generation_tokens", 0),
-            "total_tokens": getattr(output, "total_tokens", 0),
-            "prompt_tps": getattr(output, "prompt_tps", 0.0),
-            "generation_tps": getattr(output, "generation_tps", 0.0),
-            "peak_memory_gb": getattr(output, "peak_memory", 0.0),
-            "generate_time_s": generate_time,
-        }
+        stats = generation_stats(output, generate_time)
 
         if VERBOSE:
             log(
@@ -589,12 +880,12 @@ def handle_vlm_infer(
 
 
 
-def handle_request(
-    conn: socket.socket, model_obj: Any, processor_obj: Any, config_obj: Any, data: str
-) -> None:
+def handle_request(conn: socket.socket, data: bytes) -> None:
     """Parse and route incoming request."""
+    # Read the model globals per request: unload_vlm()/reload swap them out
+    model_obj, processor_obj = model, processor
     try:
-        request = json.loads(data)
+        request = decode_json(data)
         request_id = request.get("id", 0)
         method = request.get("method", "")
         params = request.get("params", {})
@@ -629,21 +920,15 @@ def handle_request(
             return
 
         if method == "vlm_infer":
-            handle_vlm_infer(
-                conn, model_obj, processor_obj, config_obj, params, request_id
-            )
+            handle_vlm_infer(conn, model_obj, processor_obj, params, request_id)
         elif method == "text_infer":
             # text_infer reuses the loaded model for text-only generation.
             # Qwen3.5 is multimodal and handles text-only prompts natively.
             # We call handle_vlm_infer directly — it already handles image=None
             # when no image paths are in the messages.
-            handle_vlm_infer(
-                conn, model_obj, processor_obj, config_obj, params, request_id
-            )
+            handle_vlm_infer(conn, model_obj, processor_obj, params, request_id)
         elif method == "text_prompt_fit":
-            handle_text_prompt_fit(
-                conn, model_obj, processor_obj, config_obj, params, request_id
-            )
+            handle_text_prompt_fit(conn, model_obj, processor_obj, params, request_id)
         elif method == "load_llm":
             global llm_model, llm_tokenizer, llm_loaded_model_name
             try:
@@ -678,47 +963,10 @@ def handle_request(
                 )
             else:
                 try:
-                    from mlx_lm import generate
-                    from mlx_lm.sample_utils import make_sampler
-
                     max_tokens = params.get("maxTokens", 8000)
                     temperature = params.get("temperature", 0.7)
                     think = params.get("think", False)
 
-                    def build_llm_prompt(tokenizer_obj: Any, prompt_params: dict) -> str | None:
-                        messages = prompt_params.get("messages", [])
-                        raw_prompt = prompt_params.get("rawPrompt")
-                        think_enabled = prompt_params.get("think", False)
-
-                        if raw_prompt:
-                            chat_messages = [{"role": "user", "content": raw_prompt}]
-                            built_prompt = tokenizer_obj.apply_chat_template(
-                                chat_messages,
-                                tokenize=False,
-                                add_generation_prompt=True,
-                                chat_template_kwargs={"enable_thinking": think_enabled},
-                            )
-                            log(
-                                f"Applied chat template to raw prompt (think={think_enabled}, temp={temperature})",
-                                "debug",
-                            )
-                            return built_prompt
-
-                        if messages:
-                            built_prompt = tokenizer_obj.apply_chat_template(
-                                messages,
-                                tokenize=False,
-                                add_generation_prompt=True,
-                                chat_template_kwargs={"enable_thinking": think_enabled},
-                            )
-                            log(
-                                f"Applied chat template to messages (think={think_enabled}, temp={temperature})",
-                                "debug",
-                            )
-                            return built_prompt
-
-                        return None
-
                     prompt = build_llm_prompt(llm_tokenizer, params)
 
                     if prompt is None:
@@ -748,15 +996,15 @@ def handle_request(
                         "debug",
                     )
                     log(f"Prompt length: {len(prompt)} chars", "debug")
-                    t_start = time.time()
+                    t_start = time.perf_counter()
 
                     # Create sampler with temperature (mlx_lm 0.30.7+ API)
-                    sampler = make_sampler(temp=temperature)
+                    sampler = llm_sampler(temperature)
 
                     signal.signal(signal.SIGALRM, timeout_handler)
                     signal.alarm(300)  # 5 minutes
                     try:
-                        output = generate(
+                        output = llm_generate(
                             llm_model,
                             llm_tokenizer,
                             prompt=prompt,
@@ -773,14 +1021,9 @@ def handle_request(
                     finally:
                         signal.alarm(0)
 
-                    if hasattr(output, "text"):
-                        response_text = output.text
-                    elif isinstance(output, str):
-                        response_text = output
-                    else:
-                        response_text = str(output)
+                    response_text = generation_text(output)
 
-                    t_end = time.time()
+                    t_end = time.perf_counter()
                     generate_time = t_end - t_start
 
                     log(f"Generation completed in {generate_time:.2f}s", "debug")
@@ -790,17 +1033,7 @@ def handle_request(
                         {
                             "id": request_id,
                             "text": response_text,
-                            "stats": {
-                                "prompt_tokens": getattr(output, "prompt_tokens", 0),
-                                "generation_tokens": getattr(
-                                    output, "generation_tokens", 0
-                                ),
-                                "total_tokens": getattr(output, "total_tokens", 0),
-                                "generation_tps": getattr(
-                                    output, "generation_tps", 0.0
-                                ),
-                                "generate_time_s": generate_time,
-                            },
+                            "stats": generation_stats(output, generate_time),
                             "done": True,
                         },
                     )
@@ -822,40 +1055,6 @@ def handle_request(
                     reserved_tokens = 24000
                     fallback_context_limit = 262144
 
-                    def build_llm_prompt(tokenizer_obj: Any, prompt_params: dict) -> str | None:
-                        messages = prompt_params.get("messages", [])
-                        raw_prompt = prompt_params.get("rawPrompt")
-                        think_enabled = prompt_params.get("think", False)
-
-                        if raw_prompt:
-                            chat_messages = [{"role": "user", "content": raw_prompt}]
-                            built_prompt = tokenizer_obj.apply_chat_template(
-                                chat_messages,
-                                tokenize=False,
-                                add_generation_prompt=True,
-                                chat_template_kwargs={"enable_thinking": think_enabled},
-                            )
-                            log(
-                                f"Applied chat template to raw prompt for fit check (think={think_enabled})",
-                                "debug",
-                            )
-                            return built_prompt
-
-                        if messages:
-                            built_prompt = tokenizer_obj.apply_chat_template(
-                                messages,
-                                tokenize=False,
-                                add_generation_prompt=True,
-                                chat_template_kwargs={"enable_thinking": think_enabled},
-                            )
-                            log(
-                                f"Applied chat template to messages for fit check (think={think_enabled})",
-                                "debug",
-                            )
-                            return built_prompt
-
-                        return None
-
                     prompt = build_llm_prompt(llm_tokenizer, params)
 
                     if prompt is None:
@@ -932,12 +1131,68 @@ def handle_request(
         send_response(conn, {"error": str(e), "done": True})
 
 
+def accept_client(selector: selectors.BaseSelector) -> None:
+    """Accept a pending connection and register it for reads."""
+    try:
+        conn, _ = server_socket.accept()
+    except (BlockingIOError, InterruptedError):
+        return
+    except OSError as e:
+        log(f"Accept error: {e}", "error")
+        return
+
+    log("Client connected", "debug")
+    conn.setblocking(True)
+    try:
+        # Room for a whole batch response (or request) in one write
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_BYTES)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_BYTES)
+    except OSError:
+        pass
+    # Per-connection state: raw byte buffer + bound request dispatcher
+    selector.register(
+        conn,
+        selectors.EVENT_READ,
+        (bytearray(), functools.partial(handle_request, conn)),
+    )
+
+
+def read_client(selector: selectors.BaseSelector, key: selectors.SelectorKey) -> None:
+    """Read what a client sent and dispatch every complete NDJSON line."""
+    conn = key.fileobj
+    buffer, dispatch = key.data
+    try:
+        chunk = conn.recv(65536)
+    except ConnectionResetError:
+        chunk = b""
+    except OSError as e:
+        log(f"Connection error: {e}", "error")
+        chunk = b""
+
+    if not chunk:
+        selector.unregister(conn)
+        conn.close()
+        log("Client disconnected", "debug")
+        return
+
+    # Framing is done by hand rather than with conn.makefile("rb"): a buffered
+    # readline() blocks until a newline arrives, which would stall every other
+    # client in the selector loop. Whole lines go to the decoder as raw bytes,
+    # so a multi-byte codepoint split across recv() calls is never decoded in
+    # halves.
+    buffer.extend(chunk)
+    while (newline := buffer.find(b"\n")) >= 0:
+        line = bytes(buffer[:newline])
+        del buffer[: newline + 1]
+        if line.strip():
+            dispatch(line)
+
+
 def main() -> None:
     """Main entry point."""
     global \
         model, \
         processor, \
-        config, \
         server_socket, \
         BRIDGE_MODE, \
         SOCKET_PATH, \
@@ -980,7 +1235,7 @@ def main() -> None:
 
     # Load model based on mode
     if BRIDGE_MODE == "vlm":
-        model, processor, config = load_model()
+        model, processor = load_model()
     else:
         # LLM mode: load model lazily on first request
         log("LLM-only mode: model will be loaded on first request")
@@ -998,45 +1253,22 @@ def main() -> None:
         "model": MODEL_NAME if BRIDGE_MODE == "vlm" else "llm-lazy",
         "mode": BRIDGE_MODE,
     }
-    print(json.dumps(ready_msg), flush=True)
-
-    # Accept connections
-    while not shutting_down:
-        try:
-            conn, _ = server_socket.accept()
-            log("Client connected", "debug")
-
-            buffer = ""
-            while True:
-                try:
-                    chunk = conn.recv(65536)
-                    if not chunk:
-                        break
-
-                    buffer += chunk.decode("utf-8")
+    print(encode_json(ready_msg).decode("utf-8"), flush=True)
 
-                    # Process complete lines
-                    while "\n" in buffer:
-                        line, buffer = buffer.split("\n", 1)
-                        if line.strip():
-                            handle_request(conn, model, processor, config, line)
-
-                except ConnectionResetError:
-                    log("Client disconnected", "debug")
-                    break
-                except Exception as e:
-                    log(f"Connection error: {e}", "error")
-                    break
-
-            conn.close()
-            log("Client disconnected", "debug")
-
-        except Exception as e:
-            if shutting_down:
-                break
-            log(f"Accept error: {e}", "error")
-            continue
+    # Serve all clients from one selector loop on the main thread. A client
+    # that reconnects is served right away instead of waiting for the old
+    # connection to close. Requests still run one at a time: generation must
+    # stay on the main thread for the SIGALRM timeout.
+    server_socket.setblocking(False)
+    selector = selectors.DefaultSelector()
+    selector.register(server_socket, selectors.EVENT_READ)
 
+    while not shutting_down:
+        for key, _ in selector.select():
+            if key.fileobj is server_socket:
+                accept_client(selector)
+            else:
+                read_client(selector, key)
 
 if __name__ == "__main__":
     main()
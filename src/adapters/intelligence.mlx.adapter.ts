@@ -18,6 +18,7 @@
 import { type ChildProcess, spawn } from 'node:child_process';
 import { existsSync, readFileSync, unlinkSync } from 'node:fs';
 import { createConnection, type Socket } from 'node:net';
+import { totalmem } from 'node:os';
 import { dirname, resolve } from 'node:path';
 import { fileURLToPath } from 'node:url';
 import Database from 'better-sqlite3';
@@ -39,8 +40,14 @@ import { getDbPath } from '../db/index.js';
 import { ensureEscribanoVenv as ensurePythonVenv } from '../python-deps.js';
 import { getPythonPath } from '../python-utils.js';
 import type { ResourceTrackable } from '../stats/types.js';
+import { collapseRepeatedFrames } from '../utils/frame-dedup.js';
 import { createLogger } from '../utils/logger.js';
 import { selectBestMLXModel } from '../utils/model-detector.js';
+import { createBatchAutotuner } from '../utils/vlm-batch-tuner.js';
+import {
+  parseInterleavedOutput,
+  stripThinkingTags,
+} from '../utils/vlm-parser.js';
 
 // ============================================================================
 // Utility Functions - Parsing, Prompts, Debug Logging
@@ -49,34 +56,29 @@ import { selectBestMLXModel } from '../utils/model-detector.js';
 const log = createLogger('MLX');
 
 /**
- * Strip <think>...</think> tags from LLM output.
- * Handles standard pairs and Qwen's orphan </think> edge case.
+ * Templated VLM prompts keyed by batch size.
+ * The prompt file is static for the lifetime of the process, so each distinct
+ * batch size only pays for the read + substitution once.
  */
-function stripThinkingTags(text: string): string {
-  // Strip complete <think>...</think> pairs (standard case)
-  let result = text.replace(/<think>[\s\S]*?<\/think>/g, '');
-
-  // Strip orphan closing tag + everything before it (Qwen3.5 actual behavior)
-  // This handles: "Let me analyze...\n</think>\n# Actual answer"
-  if (result.includes('</think>')) {
-    const parts = result.split('</think>');
-    result = parts[parts.length - 1]; // Take content after the last </think>
-  }
-
-  return result.trim();
-}
+const vlmPromptCache = new Map<number, string>();
 
 /**
  * Load VLM prompt template from prompts/vlm-batch.md or use inline fallback.
  */
 function loadVlmPrompt(batchSize: number): string {
-  try {
-    const promptPath = resolve(__dirname, '../../prompts/vlm-batch.md');
-    const content = readFileSync(promptPath, 'utf-8');
-    return content.replace('{{FRAME_COUNT}}', String(batchSize));
-  } catch {
-    // Fallback to inline prompt
-    return `Analyze these ${batchSize} screenshots from a screen recording.
+  const cached = vlmPromptCache.get(batchSize);
+  if (cached !== undefined) return cached;
+
+  const prompt = readVlmPrompt(batchSize);
+  vlmPromptCache.set(batchSize, prompt);
+  return prompt;
+}
+
+/**
+ * Inline prompt used when prompts/vlm-batch.md cannot be read.
+ * Uses the same {{FRAME_COUNT}} placeholder as the prompt file.
+ */
+const FALLBACK_VLM_PROMPT = `Analyze these {{FRAME_COUNT}} screenshots from a screen recording.
 
 For each frame above, provide:
 - description: What's on screen? Be specific about content, text, and UI elements.
@@ -84,85 +86,20 @@ For each frame above, provide:
 - apps: Which applications are visible?
 - topics: What topics, projects, or technical subjects?
 
-Output in this exact format for each frame:
-Frame 1: description: ... | activity: ... | apps: [...] | topics: [...]
-Frame 2: description: ... | activity: ... | apps: [...] | topics: [...]
-...and so on for all ${batchSize} frames.`;
-  }
-}
+Output one line of compact JSON per frame:
+{"frame": 1, "description": "...", "activity": "...", "apps": ["..."], "topics": ["..."]}
+{"frame": 2, "description": "...", "activity": "...", "apps": ["..."], "topics": ["..."]}
+...and so on for all {{FRAME_COUNT}} frames.`;
 
-/**
- * Parse interleaved multi-frame VLM output.
- * Handles the pipe-delimited format returned by MLX-VLM.
- */
-function parseInterleavedOutput(
-  text: string,
-  batch: Array<{ index: number; timestamp: number; imagePath: string }>
-): Array<{
-  index: number;
-  timestamp: number;
-  imagePath: string;
-  description: string;
-  activity: string;
-  apps: string[];
-  topics: string[];
-  raw_response?: string;
-}> {
-  const results: Array<{
-    index: number;
-    timestamp: number;
-    imagePath: string;
-    description: string;
-    activity: string;
-    apps: string[];
-    topics: string[];
-    raw_response?: string;
-  }> = [];
-
-  for (let frameNum = 1; frameNum <= batch.length; frameNum++) {
-    const frame = batch[frameNum - 1];
-
-    // Look for "Frame N: description: ..." pattern
-    const pattern = new RegExp(
-      `Frame ${frameNum}:\\s*description:\\s*(.+?)\\s*\\|\\s*activity:\\s*(.+?)\\s*\\|\\s*apps:\\s*(\\[.+?\\]|[^|]+)\\s*\\|\\s*topics:\\s*(.+?)(?=Frame \\d+:|$)`,
-      'is'
-    );
-    const match = text.match(pattern);
-
-    if (match) {
-      const appsStr = match[3].replace(/^\[|\]$/g, '').trim();
-      const topicsStr = match[4].replace(/^\[|\]$/g, '').trim();
-
-      results.push({
-        index: frame.index,
-        timestamp: frame.timestamp,
-        imagePath: frame.imagePath,
-        description: match[1].trim(),
-        activity: match[2].trim(),
-        apps: appsStr
-          .split(',')
-          .map((s) => s.trim())
-          .filter(Boolean),
-        topics: topicsStr
-          .split(',')
-          .map((s) => s.trim())
-          .filter(Boolean),
-      });
-    } else {
-      results.push({
-        index: frame.index,
-        timestamp: frame.timestamp,
-        imagePath: frame.imagePath,
-        description: `Failed to parse Frame ${frameNum}`,
-        activity: 'unknown',
-        apps: [],
-        topics: [],
-        raw_response: text,
-      });
-    }
+function readVlmPrompt(batchSize: number): string {
+  let template = FALLBACK_VLM_PROMPT;
+  try {
+    const promptPath = resolve(__dirname, '../../prompts/vlm-batch.md');
+    template = readFileSync(promptPath, 'utf-8');
+  } catch {
+    // Fall back to the inline prompt
   }
-
-  return results;
+  return template.replaceAll('{{FRAME_COUNT}}', String(batchSize));
 }
 
 /**
@@ -205,6 +142,7 @@ function logLlmCallToDb(
 interface MlxConfig {
   model: string;
   batchSize: number;
+  autotune: boolean;
   maxTokens: number;
   socketPath: string;
   bridgeScript: string;
@@ -236,6 +174,9 @@ export async function resolvePythonPath(): Promise<string> {
 
 let globalCleanup: (() => void) | null = null;
 
+/** Share of system RAM the VLM may peak at while autotuning batch size. */
+const AUTOTUNE_MEMORY_FRACTION = 0.6;
+
 export function cleanupMlxBridge(): void {
   if (globalCleanup) {
     log.debug('Explicit cleanup called');
@@ -253,6 +194,7 @@ export function createMlxIntelligenceService(
   const mlxConfig: MlxConfig = {
     model: config.vlmModel,
     batchSize: config.vlmBatchSize,
+    autotune: config.vlmAutotune,
     maxTokens: config.vlmMaxTokens,
     socketPath: config.mlxSocketPath,
     bridgeScript: resolve(__dirname, '../../scripts/mlx_bridge.py'),
@@ -539,7 +481,12 @@ export function createMlxIntelligenceService(
       await startBridge(bridgeState, mode, socketPath);
     }
 
-    const socket = await connect(bridgeState, socketPath);
+    // Reuse a live socket without awaiting, so a pipelined request is written
+    // before the caller goes on to handle the previous response
+    const socket =
+      bridgeState.socket && !bridgeState.socket.destroyed
+        ? bridgeState.socket
+        : await connect(bridgeState, socketPath);
 
     return new Promise((resolvePromise, rejectPromise) => {
       const responses: T[] = [];
@@ -667,80 +614,112 @@ export function createMlxIntelligenceService(
       const startTime = Date.now();
       const allResults: FrameDescription[] = [];
 
-      // Convert input images to indexed list
-      const imageList = images.map((img, idx) => ({
-        index: idx,
-        timestamp: img.timestamp,
-        imagePath: img.imagePath,
-      }));
-
-      // Process in batches
-      for (
-        let batchStart = 0;
-        batchStart < imageList.length;
-        batchStart += mlxConfig.batchSize
-      ) {
-        const batchEnd = Math.min(
-          batchStart + mlxConfig.batchSize,
-          imageList.length
+      // Convert input images to indexed list, collapsing runs of identical
+      // frames so each run is described once
+      const runs = await collapseRepeatedFrames(
+        images.map((img, idx) => ({
+          index: idx,
+          timestamp: img.timestamp,
+          imagePath: img.imagePath,
+        }))
+      );
+      const imageList = runs.map((run) => run.frame);
+      const repeatsByIndex = new Map(
+        runs.map((run) => [run.frame.index, run.repeats])
+      );
+      if (imageList.length < total) {
+        console.log(
+          `[VLM] Skipping ${total - imageList.length} frames identical to the previous frame`
         );
+      }
+
+      const autotuner = mlxConfig.autotune
+        ? createBatchAutotuner(
+            mlxConfig.batchSize,
+            (totalmem() / 1024 ** 3) * AUTOTUNE_MEMORY_FRACTION
+          )
+        : null;
+
+      const sendBatch = (batchStart: number) => {
+        const batchSize = autotuner?.nextBatchSize() ?? mlxConfig.batchSize;
+        // Ask now, so the prefetch matches the next batch while probing
+        const nextBatchSize = autotuner?.followingBatchSize() ?? batchSize;
+        const batchEnd = Math.min(batchStart + batchSize, imageList.length);
         const batch = imageList.slice(batchStart, batchEnd);
 
-        log.debug(`Processing batch: ${batchStart + 1}-${batchEnd}/${total}`);
+        log.debug(
+          `Processing batch: ${batchStart + 1}-${batchEnd}/${imageList.length}`
+        );
 
-        try {
-          // Load VLM prompt for this batch
-          const prompt = options.prompt ?? loadVlmPrompt(batch.length);
-
-          // Build interleaved messages: [label, image, label, image, ..., prompt]
-          // This matches the old Python structure that worked correctly
-          const content: Array<
-            | { type: 'text'; text: string }
-            | { type: 'image'; imagePath: string }
-          > = [];
-
-          for (let i = 0; i < batch.length; i++) {
-            const frameNum = i + 1;
-            const timestamp = batch[i].timestamp;
-
-            content.push({
-              type: 'text' as const,
-              text: `Frame ${frameNum} (timestamp: ${timestamp}s):`,
-            });
+        // Load VLM prompt for this batch
+        const prompt = options.prompt ?? loadVlmPrompt(batch.length);
 
-            content.push({
-              type: 'image' as const,
-              imagePath: batch[i].imagePath,
-            });
-          }
+        // Build interleaved messages: [label, image, label, image, ..., prompt]
+        // This matches the old Python structure that worked correctly
+        const content: Array<
+          { type: 'text'; text: string } | { type: 'image'; imagePath: string }
+        > = [];
+
+        for (let i = 0; i < batch.length; i++) {
+          const frameNum = i + 1;
+          const timestamp = batch[i].timestamp;
 
           content.push({
             type: 'text' as const,
-            text: prompt,
+            text: `Frame ${frameNum} (timestamp: ${timestamp}s):`,
           });
 
-          const messages = [
-            {
-              role: 'user' as const,
-              content,
-            },
-          ];
-
-          // Send single batch request
-          const requestId = Date.now() + batchStart;
-          const responses = await sendRequest(
-            vlmBridge,
-            getVlmSocketPath(),
-            'vlm',
-            {
-              id: requestId,
-              method: 'vlm_infer',
-              params: {
-                messages,
-                maxTokens: mlxConfig.maxTokens,
-              },
-            }
-          );
+          content.push({
+            type: 'image' as const,
+            imagePath: batch[i].imagePath,
+          });
+        }
+
+        content.push({
+          type: 'text' as const,
+          text: prompt,
+        });
+
+        const messages = [
+          {
+            role: 'user' as const,
+            content,
+          },
+        ];
+
+        // Let the bridge decode the next batch's images during generation
+        const prefetchImagePaths = imageList
+          .slice(batchEnd, batchEnd + nextBatchSize)
+          .map((frame) => frame.imagePath);
+
+        // Send single batch request
+        const startedAt = Date.now();
+        const responses = sendRequest(vlmBridge, getVlmSocketPath(), 'vlm', {
+          id: startedAt + batchStart,
+          method: 'vlm_infer',
+          params: {
+            messages,
+            maxTokens: mlxConfig.maxTokens,
+            prefetchImagePaths,
+          },
+        });
+        // Awaited below; this only keeps a failure that lands while the
+        // previous batch is still being handled from going unobserved
+        responses.catch(() => {});
+
+        return { batch, batchStart, batchEnd, startedAt, responses };
+      };
+
+      // Process in batches, keeping one request in flight: the next batch is
+      // sent as soon as the current response arrives, so parsing and the
+      // progress callbacks overlap the next generate()
+      let inFlight: ReturnType<typeof sendBatch> | null = sendBatch(0);
+      while (inFlight) {
+        const current = inFlight;
+        const { batch, batchStart, batchEnd, startedAt } = current;
+
+        try {
+          const responses = await current.responses;
 
           if (responses.length === 0) {
             throw new Error('No response from VLM inference');
@@ -766,6 +745,19 @@ export function createMlxIntelligenceService(
           const rawText = response.text || '';
           log.debug(`VLM returned ${rawText.length} chars`);
 
+          // Parse interleaved output (JSON lines, pipe-delimited fallback)
+          const parsed = parseInterleavedOutput(rawText, batch.length, batch);
+
+          // Frames that failed to parse don't count toward throughput
+          autotuner?.record(
+            batch.length,
+            parsed.filter((r) => r.raw_response === undefined).length,
+            (Date.now() - startedAt) / 1000,
+            response.stats?.peak_memory_gb ?? 0
+          );
+
+          inFlight = batchEnd < imageList.length ? sendBatch(batchEnd) : null;
+
           const vlm_stats = response.stats
             ? {
                 model: mlxConfig.model,
@@ -781,29 +773,40 @@ export function createMlxIntelligenceService(
               }
             : undefined;
 
-          // Parse interleaved output
-          // TODO: this next line destroys the usability of this method; because tights the parsin login to specifric output format, it makes it very hard to change the output format in the future without breaking this method. We should consider changing the output format to be more structured (e.g. JSONL with frame numbers) to avoid this brittle parsing logic.
-          const batchResults = parseInterleavedOutput(rawText, batch).map(
-            (r) => ({
-              ...r,
-              vlm_stats,
-            })
-          );
+          const batchResults = parsed.map((r, i) => ({
+            ...r,
+            timestamp: batch[i].timestamp,
+            imagePath: batch[i].imagePath,
+            vlm_stats,
+          }));
 
-          // Append results and invoke callback with cumulative progress
+          // Append results (fanned out to repeated frames, which cost no
+          // inference) and invoke callback with cumulative progress
+          const doneBefore = allResults.length;
           for (const result of batchResults) {
-            allResults.push(result);
-            const cumulativeProgress = {
-              current: allResults.length,
-              total,
-            };
-            if (options.onImageProcessed) {
-              options.onImageProcessed(result, cumulativeProgress);
+            const repeats = repeatsByIndex.get(result.index) ?? [];
+            for (const frame of [result, ...repeats]) {
+              const frameResult =
+                frame === result
+                  ? result
+                  : { ...result, ...frame, vlm_stats: undefined };
+              allResults.push(frameResult);
+              const cumulativeProgress = {
+                current: allResults.length,
+                total,
+              };
+              if (options.onImageProcessed) {
+                options.onImageProcessed(frameResult, cumulativeProgress);
+              }
             }
           }
 
-          // Log progress roughly every 10 frames
-          if (allResults.length % 10 === 0 || allResults.length === total) {
+          // Log progress each time the count passes a multiple of 10; a
+          // fanned-out batch can jump over the exact multiple
+          if (
+            Math.floor(allResults.length / 10) > Math.floor(doneBefore / 10) ||
+            allResults.length === total
+          ) {
             console.log(
               `[VLM] [${allResults.length}/${total}] frames processed`
             );
@@ -813,6 +816,11 @@ export function createMlxIntelligenceService(
           console.error(
             `[VLM] Batch ${batchStart + 1}-${batchEnd} failed: ${message}`
           );
+          // The next batch may already be generating; let it finish so the
+          // bridge isn't left busy with a request nobody reads
+          if (inFlight !== current) {
+            await inFlight?.responses.catch(() => {});
+          }
           throw batchError;
         }
       }
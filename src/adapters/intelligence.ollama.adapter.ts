@@ -5,6 +5,7 @@
  */
 
 import { readFileSync } from 'node:fs';
+import { readFile } from 'node:fs/promises';
 import { dirname, resolve } from 'node:path';
 import { fileURLToPath } from 'node:url';
 import { Agent, fetch as undiciFetch } from 'undici';
@@ -25,9 +26,33 @@ import {
 } from '../0_types.js';
 import { loadConfig } from '../config.js';
 import { createLogger } from '../utils/logger.js';
+import { splitList, stripBrackets } from '../utils/vlm-parser.js';
 
 const log = createLogger('Ollama');
 
+/**
+ * Dispatchers keyed by timeout. Reusing one keeps connections to Ollama
+ * alive across frames, retries and calls instead of opening a fresh pool
+ * per request.
+ */
+const ollamaAgents = new Map<number, Agent>();
+
+/**
+ * Agent with extended headers timeout to prevent UND_ERR_HEADERS_TIMEOUT
+ * when models take a long time to generate the first token (thinking mode).
+ */
+function getOllamaAgent(timeout: number): Agent {
+  let agent = ollamaAgents.get(timeout);
+  if (!agent) {
+    agent = new Agent({
+      headersTimeout: timeout,
+      connectTimeout: timeout,
+    });
+    ollamaAgents.set(timeout, agent);
+  }
+  return agent;
+}
+
 const __dirname = dirname(fileURLToPath(import.meta.url));
 
 // Zod schema for VLM batch response validation
@@ -373,6 +398,32 @@ interface ParsedVLM {
   topics: string[];
 }
 
+const VLM_RESPONSE_PATTERN =
+  /^description:\s*(.+?)\s*\|\s*activity:\s*(.+?)\s*\|\s*apps:\s*(\[.+?\]|[^|]+)\s*\|\s*topics:\s*(.+)$/s;
+
+const VLM_RESPONSE_LABELS = ['description:', 'activity:', 'apps:', 'topics:'];
+
+/**
+ * Split a well-formed response on its pipes without running the regex.
+ * Returns null for anything unusual (extra pipes, missing labels, empty
+ * fields) so VLM_RESPONSE_PATTERN stays the authority on odd output.
+ */
+function splitVLMFields(content: string): string[] | null {
+  const parts = content.split('|');
+  if (parts.length !== VLM_RESPONSE_LABELS.length) return null;
+
+  const fields: string[] = [];
+  for (let i = 0; i < parts.length; i++) {
+    const label = VLM_RESPONSE_LABELS[i];
+    const part = i === 0 ? parts[i] : parts[i].trimStart();
+    if (!part.startsWith(label)) return null;
+    const value = part.slice(label.length).trim();
+    if (!value) return null;
+    fields.push(value);
+  }
+  return fields;
+}
+
 /**
  * Parse single-image VLM response.
  * Returns parsed data or fallback values.
@@ -382,29 +433,20 @@ function parseVLMResponse(content: string): ParsedVLM {
     return { description: '', activity: 'unknown', apps: [], topics: [] };
   }
 
-  const regex =
-    /^description:\s*(.+?)\s*\|\s*activity:\s*(.+?)\s*\|\s*apps:\s*(\[.+?\]|[^|]+)\s*\|\s*topics:\s*(.+)$/s;
-  const match = content.match(regex);
+  const fields =
+    splitVLMFields(content) ??
+    content.match(VLM_RESPONSE_PATTERN)?.slice(1, 5) ??
+    null;
 
-  if (match) {
-    const appsStr = match[3].replace(/^\[|\]$/g, '').trim();
-    const topicsStr = match[4].replace(/^\[|\]$/g, '').trim();
+  if (fields) {
+    const appsStr = stripBrackets(fields[2]);
+    const topicsStr = stripBrackets(fields[3]);
 
     return {
-      description: match[1].trim(),
-      activity: match[2].trim(),
-      apps: appsStr
-        ? appsStr
-            .split(',')
-            .map((s) => s.trim())
-            .filter(Boolean)
-        : [],
-      topics: topicsStr
-        ? topicsStr
-            .split(',')
-            .map((s) => s.trim())
-            .filter(Boolean)
-        : [],
+      description: fields[0].trim(),
+      activity: fields[1].trim(),
+      apps: splitList(appsStr),
+      topics: splitList(topicsStr),
     };
   }
 
@@ -418,6 +460,17 @@ function parseVLMResponse(content: string): ParsedVLM {
   };
 }
 
+/**
+ * Read a frame and base64-encode it for the request's images field.
+ */
+async function encodeImage(imagePath: string): Promise<string> {
+  try {
+    return (await readFile(imagePath)).toString('base64');
+  } catch (readError) {
+    throw new Error(`Failed to read image: ${(readError as Error).message}`);
+  }
+}
+
 /**
  * Describe images sequentially (one at a time).
  * Each image gets its own VLM request for accurate image-description mapping.
@@ -471,9 +524,19 @@ async function describeImagesWithOllama(
   console.log(`[VLM] Model: ${model}`);
   const startTime = Date.now();
 
+  // Read and encode the next frame while the current request is in flight
+  const encodeFrame = (i: number) => {
+    const encoded = encodeImage(images[i].imagePath);
+    encoded.catch(() => {}); // awaited (and reported) in the retry loop
+    return encoded;
+  };
+  let nextEncoded = images.length > 0 ? encodeFrame(0) : null;
+
   for (let i = 0; i < images.length; i++) {
     const image = images[i];
     const current = i + 1;
+    let encoded = nextEncoded as Promise<string>;
+    nextEncoded = i + 1 < images.length ? encodeFrame(i + 1) : null;
     const imageStartTime = Date.now();
     let lastError: Error | null = null;
     let success = false;
@@ -481,31 +544,20 @@ async function describeImagesWithOllama(
     // 3 retry attempts
     for (let attempt = 1; attempt <= 3 && !success; attempt++) {
       try {
-        // Read and encode image
-        let base64Image: string;
-        try {
-          const buffer = readFileSync(image.imagePath);
-          base64Image = buffer.toString('base64');
-        } catch (readError) {
-          throw new Error(
-            `Failed to read image: ${(readError as Error).message}`
-          );
-        }
+        const base64Image = await encoded.catch((error) => {
+          // Re-read on the next attempt rather than rethrowing this failure
+          encoded = encodeFrame(i);
+          throw error;
+        });
 
         const prompt = buildVLMSingleImagePrompt();
         const controller = new AbortController();
         const timeoutId = setTimeout(() => controller.abort(), timeout);
 
-        // Custom agent with extended headers timeout to prevent UND_ERR_HEADERS_TIMEOUT
-        const agent = new Agent({
-          headersTimeout: timeout,
-          connectTimeout: timeout,
-        });
-
         const response = await undiciFetch(endpoint, {
           method: 'POST',
           headers: { 'Content-Type': 'application/json' },
-          dispatcher: agent,
+          dispatcher: getOllamaAgent(timeout),
           body: JSON.stringify({
             model,
             messages: [
@@ -772,19 +824,12 @@ async function callOllama(
 
       log.debug(`[${requestId}] Attempt ${attempt}/${maxRetries}...`);
 
-      // Custom agent with extended headers timeout to prevent UND_ERR_HEADERS_TIMEOUT
-      // when models take a long time to generate the first token (thinking mode)
-      const agent = new Agent({
-        headersTimeout: timeout,
-        connectTimeout: timeout,
-      });
-
       const response = await undiciFetch(endpoint, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        dispatcher: agent,
+        dispatcher: getOllamaAgent(timeout),
         body: JSON.stringify({
           model: options.model,
           messages: [
@@ -24,6 +24,7 @@ const configSchema = z.object({
   // === PERFORMANCE ===
   frameWidth: z.number().int().min(320).max(3840).default(1024),
   vlmBatchSize: z.number().int().min(1).max(8).default(2),
+  vlmAutotune: z.boolean().default(false),
   sampleInterval: z.number().int().min(1).max(60).default(10),
 
   // === QUALITY ===
@@ -108,6 +109,7 @@ function getRamTier(ramGB: number): {
 const BASE_DEFAULTS = {
   frameWidth: 1024,
   vlmBatchSize: 2,
+  vlmAutotune: false,
   sampleInterval: 10,
   sceneThreshold: 0.4,
   vlmMaxTokens: 2000,
@@ -139,6 +141,7 @@ const CONFIG_TEMPLATE = `# Escribano Configuration - ~/.escribano/.env
 # === PERFORMANCE ===
 # ESCRIBANO_FRAME_WIDTH=1024          # Auto-adjusted based on RAM (1024 for 16GB+, 768 for <16GB)
 # ESCRIBANO_VLM_BATCH_SIZE=2          # 1-4 frames (lower = more reliable)
+# ESCRIBANO_VLM_AUTOTUNE=false        # Probe batch sizes 2/4/8 and keep the fastest
 ESCRIBANO_SAMPLE_INTERVAL=10          # Base frame sampling (seconds)
 
 # === QUALITY ===
@@ -264,6 +267,12 @@ export function loadConfig(): Config {
       sources,
       'vlmBatchSize'
     ),
+    vlmAutotune: parseEnvBooleanWithSource(
+      'ESCRIBANO_VLM_AUTOTUNE',
+      BASE_DEFAULTS.vlmAutotune,
+      sources,
+      'vlmAutotune'
+    ),
     sampleInterval: parseEnvNumberWithSource(
       'ESCRIBANO_SAMPLE_INTERVAL',
       BASE_DEFAULTS.sampleInterval,
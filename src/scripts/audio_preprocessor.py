@@ -17,12 +17,27 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import torch
 import soundfile as sf
 import numpy as np
+from silero_vad import get_speech_timestamps, load_silero_vad
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+SEGMENT_WRITE_WORKERS = 4
+
+# RMS gate in front of Silero: windows at or below this level are digital silence
+RMS_WINDOW_SECONDS = 1.0
+RMS_SILENCE_LEVEL = 1e-4
+RMS_PAD_SECONDS = 0.5
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Audio Preprocessor with Silero VAD")
@@ -32,73 +47,134 @@ def parse_args():
     parser.add_argument("--threshold", type=float, default=0.5, help="VAD threshold (default: 0.5)")
     parser.add_argument("--min-speech-duration-ms", type=int, default=250, help="Min speech duration in ms")
     parser.add_argument("--min-silence-duration-ms", type=int, default=1000, help="Min silence duration in ms")
+    parser.add_argument("--no-rms-prefilter", dest="rms_prefilter", action="store_false", help="Run VAD over silent stretches too")
+    parser.add_argument("--onnx", action="store_true", help="Run the ONNX build of Silero VAD (requires onnxruntime)")
     return parser.parse_args()
 
+@functools.lru_cache(maxsize=2)
+def load_vad(onnx: bool = False):
+    """Load Silero VAD once per process; preprocess() calls reuse it."""
+    if not onnx:
+        # Per-window tensors are tiny; past a few threads, sync costs more than it buys
+        torch.set_num_threads(min(4, os.cpu_count() or 1))
+    # The silero-vad wheel ships the weights; no torch.hub repo fetch or hubconf import
+    return load_silero_vad(onnx=onnx)
+
 def read_audio_sf(path: str, sampling_rate: int = 16000):
-    wav, sr = sf.read(path)
-    if len(wav.shape) > 1:
-        wav = np.mean(wav, axis=1)
+    # Decode straight to float32 so the downmix and torch hand-off don't copy
+    wav, sr = sf.read(path, dtype='float32')
+    if wav.ndim > 1:
+        wav = wav.mean(axis=1, dtype=np.float32)
     if sr != sampling_rate:
         # Note: We expect the input to be pre-converted by ffmpeg to 16000
         # But if not, we would need a resampler. For now, we assume sr is correct.
         pass
-    return torch.from_numpy(wav.astype(np.float32))
+    return torch.from_numpy(wav)
 
-def main():
-    args = parse_args()
-    
-    if not args.audio.exists():
-        print(f"Error: Audio file not found: {args.audio}")
-        return 1
-        
-    args.output_dir.mkdir(parents=True, exist_ok=True)
+def voiced_ranges(wav: np.ndarray, sampling_rate: int):
+    """Sample ranges whose per-second RMS is above silence, padded and merged."""
+    window = int(sampling_rate * RMS_WINDOW_SECONDS)
+    full = len(wav) // window
+    frames = wav[:full * window].reshape(full, window)
+    energy = np.einsum('ij,ij->i', frames, frames) / window
+    tail = wav[full * window:]
+    if len(tail):
+        energy = np.append(energy, np.dot(tail, tail) / len(tail))
+    loud = np.sqrt(energy) > RMS_SILENCE_LEVEL
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], loud.astype(np.int8), [0]))))
+    pad = int(sampling_rate * RMS_PAD_SECONDS)
+    ranges = []
+    for first, last in zip(edges[::2], edges[1::2]):
+        start = max(0, int(first) * window - pad)
+        end = min(len(wav), int(last) * window + pad)
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+def preprocess(audio_path: Path, output_dir: Path, output_json: Path, threshold: float = 0.5,
+               min_speech_duration_ms: int = 250, min_silence_duration_ms: int = 1000,
+               onnx: bool = False, rms_prefilter: bool = True):
+    """Write one WAV per speech segment plus a manifest; returns the segments."""
+    output_dir.mkdir(parents=True, exist_ok=True)
     
     # Load Silero VAD model
-    model, utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                  model='silero_vad',
-                                  force_reload=False,
-                                  onnx=False)
-    
-    (get_speech_timestamps, _, _, _, _) = utils
+    model = load_vad(onnx)
     
     # Load audio
     sampling_rate = 16000
-    wav = read_audio_sf(str(args.audio), sampling_rate=sampling_rate)
+    wav = read_audio_sf(str(audio_path), sampling_rate=sampling_rate)
     
     # Get speech timestamps
-    speech_timestamps = get_speech_timestamps(
-        wav, 
-        model, 
+    vad_options = dict(
         sampling_rate=sampling_rate,
-        threshold=args.threshold,
-        min_speech_duration_ms=args.min_speech_duration_ms,
-        min_silence_duration_ms=args.min_silence_duration_ms
+        threshold=threshold,
+        min_speech_duration_ms=min_speech_duration_ms,
+        min_silence_duration_ms=min_silence_duration_ms
     )
+    if rms_prefilter:
+        # Only hand Silero the stretches that aren't silent
+        speech_timestamps = []
+        for start, end in voiced_ranges(wav.numpy(), sampling_rate):
+            for ts in get_speech_timestamps(wav[start:end], model, **vad_options):
+                speech_timestamps.append({'start': ts['start'] + start, 'end': ts['end'] + start})
+    else:
+        speech_timestamps = get_speech_timestamps(wav, model, **vad_options)
     
     segments = []
     
-    for i, ts in enumerate(speech_timestamps):
-        start_sec = ts['start'] / sampling_rate
-        end_sec = ts['end'] / sampling_rate
+    # Encoding and disk writes release the GIL; overlap them across segments
+    with ThreadPoolExecutor(max_workers=SEGMENT_WRITE_WORKERS) as writer:
+        writes = []
+        for i, ts in enumerate(speech_timestamps):
+            start_sec = ts['start'] / sampling_rate
+            end_sec = ts['end'] / sampling_rate
+            
+            # Extract segment (a view; wav is never modified)
+            segment_wav = wav[ts['start']:ts['end']].numpy()
+            
+            # Save segment to WAV using soundfile
+            segment_filename = f"segment_{i:04d}.wav"
+            segment_path = output_dir / segment_filename
+            
+            writes.append(writer.submit(sf.write, str(segment_path), segment_wav, sampling_rate))
+            
+            segments.append({
+                "start": float(start_sec),
+                "end": float(end_sec),
+                "audioPath": str(segment_path)
+            })
         
-        # Extract segment
-        segment_wav = wav[ts['start']:ts['end']].numpy()
-        
-        # Save segment to WAV using soundfile
-        segment_filename = f"segment_{i:04d}.wav"
-        segment_path = args.output_dir / segment_filename
-        
-        sf.write(str(segment_path), segment_wav, sampling_rate)
-        
-        segments.append({
-            "start": float(start_sec),
-            "end": float(end_sec),
-            "audioPath": str(segment_path)
-        })
+        for write in writes:
+            write.result()
         
     # Write manifest
-    with open(args.output_json, "w") as f:
-        json.dump(segments, f, indent=2)
+    if orjson is not None:
+        output_json.write_bytes(orjson.dumps(segments, option=orjson.OPT_INDENT_2))
+    else:
+        output_json.write_text(json.dumps(segments, indent=2))
+    
+    return segments
+
+def main():
+    args = parse_args()
+    
+    if not args.audio.exists():
+        print(f"Error: Audio file not found: {args.audio}")
+        return 1
+    
+    segments = preprocess(
+        args.audio,
+        args.output_dir,
+        args.output_json,
+        threshold=args.threshold,
+        min_speech_duration_ms=args.min_speech_duration_ms,
+        min_silence_duration_ms=args.min_silence_duration_ms,
+        onnx=args.onnx,
+        rms_prefilter=args.rms_prefilter,
+    )
         
     print(f"Extracted {len(segments)} speech segments to {args.output_dir}")
     print(f"Manifest written to {args.output_json}")
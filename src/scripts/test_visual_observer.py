@@ -1,4 +1,5 @@
 import json
+import sys
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -20,6 +21,23 @@ class TestVisualObserverBase(unittest.TestCase):
         from visual_observer_base import UI_CATEGORIES, CATEGORY_LABELS
         self.assertEqual(len(UI_CATEGORIES), len(CATEGORY_LABELS))
 
+    def test_extract_ocr_falls_back_when_tesserocr_fails_to_start(self):
+        import visual_observer_base as vob
+
+        fake_tesserocr = MagicMock()
+        fake_tesserocr.PyTessBaseAPI.side_effect = RuntimeError("Failed to init API")
+
+        with patch.dict(sys.modules, {"tesserocr": fake_tesserocr}), \
+                patch.object(vob, "_tess_api", None), \
+                patch.object(vob, "_tess_unavailable", False), \
+                patch.object(vob.Image, "open", return_value=MagicMock()), \
+                patch.object(vob.pytesseract, "image_to_string", return_value=" hello \n"):
+            self.assertEqual("hello", vob.extract_ocr(Path("frame_0001.jpg")))
+            self.assertEqual("hello", vob.extract_ocr(Path("frame_0002.jpg")))
+
+        # The failed init is remembered instead of retried on every frame
+        self.assertEqual(1, fake_tesserocr.PyTessBaseAPI.call_count)
+
 class TestVisualObserverDescribe(unittest.TestCase):
     @patch('requests.post')
     def test_call_ollama_vision_batch(self, mock_post):
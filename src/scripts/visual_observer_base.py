@@ -7,10 +7,11 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
 import os
 import time
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import TypedDict
 
@@ -18,7 +19,13 @@ import open_clip
 import pytesseract
 import torch
 from PIL import Image
-from sklearn.cluster import AgglomerativeClustering
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 
 # Type definitions
@@ -50,9 +57,13 @@ class VisualIndex(TypedDict):
 # Constants
 # Prefer MPS for Apple Silicon, fallback to CPU
 DEVICE = "mps" if torch.backends.mps.is_available() else "cpu"
+# Half precision on the accelerator; CPU kernels are fastest in fp32
+CLIP_DTYPE = torch.float32 if DEVICE == "cpu" else torch.float16
 CLIP_MODEL = "ViT-B-32"
 CLIP_PRETRAINED = "laion2b_s34b_b79k"
 CLUSTER_DISTANCE_THRESHOLD = 0.15  # 1 - 0.85 similarity
+CLIP_BATCH_SIZE = 32  # Images per encode_image call
+CLUSTER_SAMPLE_CAP = 2000  # Max frames fed to linkage (~1h at 2s intervals)
 
 UI_CATEGORIES = [
     "A screenshot of a code editor showing programming code",
@@ -107,14 +118,51 @@ def load_frames(frames_dir: Path, frame_interval: float) -> list[tuple[int, floa
     return frames
 
 
+# Per-process tesserocr handle, created on first use inside each OCR worker.
+# _tess_unavailable marks a worker without tesserocr, or whose engine failed
+# to start (bad tessdata path, missing language pack); it uses pytesseract for
+# the rest of the run.
+_tess_api = None
+_tess_unavailable = False
+
+
+def get_tess_api():
+    """Return this process's Tesseract API, or None to fall back to pytesseract."""
+    global _tess_api, _tess_unavailable
+    if _tess_api is None and not _tess_unavailable:
+        try:
+            # Imported here rather than at module load: the OpenMP runtime
+            # Tesseract links reads OMP_THREAD_LIMIT once, when it is loaded,
+            # so it must come after limit_ocr_threads has run in this worker.
+            import tesserocr  # type: ignore
+        except ImportError:  # pragma: no cover - optional dependency
+            _tess_unavailable = True
+            return None
+        try:
+            _tess_api = tesserocr.PyTessBaseAPI(
+                psm=tesserocr.PSM.SPARSE_TEXT, oem=tesserocr.OEM.DEFAULT
+            )
+        except Exception as e:
+            print(f"  Warning: tesserocr init failed, falling back to pytesseract: {e}")
+            _tess_unavailable = True
+    return _tess_api
+
+
 def extract_ocr(image_path: Path) -> str:
     """Extract text from image using Tesseract.
     
     Uses PSM 11 (sparse text) which works better for UI screenshots
     where text is scattered across the screen (menus, buttons, tabs, URLs).
+    With tesserocr installed the engine stays loaded in-process; otherwise,
+    or if it fails to start, each call runs the tesseract CLI through
+    pytesseract.
     """
     try:
         image = Image.open(image_path)
+        api = get_tess_api()
+        if api is not None:
+            api.SetImage(image)
+            return api.GetUTF8Text().strip()
         # PSM 11: Sparse text - finds text scattered anywhere (UI elements)
         # OEM 3: Default OCR engine mode (LSTM if available)
         custom_config = r'--psm 11 --oem 3'
@@ -125,6 +173,45 @@ def extract_ocr(image_path: Path) -> str:
         return ""
 
 
+def file_digest(path: Path) -> str | None:
+    """SHA-1 of an image file, or None if it can't be read."""
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def find_ocr_sources(
+    frames: list[tuple[int, float, Path]],
+    max_workers: int,
+) -> dict[int, int]:
+    """Map each frame index to the frame whose OCR text it can reuse.
+    
+    A static screen yields byte-identical JPEGs, so every frame in a run of
+    identical files points at the first frame of that run. Unreadable frames
+    always point at themselves.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = list(executor.map(file_digest, (path for _, _, path in frames)))
+    
+    sources = {}
+    for pos, (idx, _, _) in enumerate(frames):
+        if pos > 0 and digests[pos] is not None and digests[pos] == digests[pos - 1]:
+            sources[idx] = sources[frames[pos - 1][0]]
+        else:
+            sources[idx] = idx
+    return sources
+
+
+def limit_ocr_threads() -> None:
+    """OCR pool initializer: one process per core already, so keep Tesseract single-threaded.
+    
+    Set in the workers only; the parent still runs CLIP and clustering on CPU.
+    Runs before the worker first imports tesserocr (see get_tess_api).
+    """
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
 def extract_ocr_parallel(
     frames: list[tuple[int, float, Path]], 
     max_workers: int
@@ -144,7 +231,9 @@ def extract_ocr_parallel(
     
     print(f"  Using {max_workers} parallel workers...")
     
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=limit_ocr_threads
+    ) as executor:
         # Submit all tasks
         future_to_idx = {
             executor.submit(extract_ocr, path): idx 
@@ -169,75 +258,123 @@ def extract_ocr_parallel(
     return results
 
 
+def preprocess_clip_batch(
+    batch: list[tuple[int, float, Path]],
+    preprocess,
+) -> tuple[list[torch.Tensor], list[int]]:
+    """Decode and preprocess a batch; returns tensors and their positions in the batch."""
+    images = []
+    loaded = []
+    for pos, (_, _, path) in enumerate(batch):
+        try:
+            images.append(preprocess(Image.open(path)))
+            loaded.append(pos)
+        except Exception as e:
+            print(f"  Warning: CLIP embedding failed for {path.name}: {e}")
+    return images, loaded
+
+
 def compute_clip_embeddings(
     frames: list[tuple[int, float, Path]],
     model,
     preprocess,
 ) -> torch.Tensor:
-    """Compute CLIP embeddings for all frames."""
-    embeddings = []
+    """Compute CLIP embeddings for all frames, CLIP_BATCH_SIZE images per forward pass.
     
-    for _, _, path in frames:
-        try:
-            image = preprocess(Image.open(path)).unsqueeze(0).to(DEVICE)
+    The next batch is decoded on a background thread while the current one
+    is encoded, so the device doesn't wait on PIL.
+    """
+    # Zero vector as fallback for failed frames to maintain alignment
+    embeddings = torch.zeros((len(frames), 512))
+    
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        pending = loader.submit(preprocess_clip_batch, frames[:CLIP_BATCH_SIZE], preprocess)
+        for start in range(0, len(frames), CLIP_BATCH_SIZE):
+            batch = frames[start:start + CLIP_BATCH_SIZE]
+            images, loaded = pending.result()
             
-            with torch.no_grad():
-                embedding = model.encode_image(image)
-                embedding = embedding / embedding.norm(dim=-1, keepdim=True)
+            # Prefetch the next batch
+            next_start = start + CLIP_BATCH_SIZE
+            if next_start < len(frames):
+                pending = loader.submit(
+                    preprocess_clip_batch,
+                    frames[next_start:next_start + CLIP_BATCH_SIZE],
+                    preprocess,
+                )
             
-            embeddings.append(embedding.cpu())
-        except Exception as e:
-            print(f"  Warning: CLIP embedding failed for {path.name}: {e}")
-            # Use zero vector as fallback to maintain alignment
-            embeddings.append(torch.zeros((1, 512)))
+            if images:
+                try:
+                    with torch.inference_mode():
+                        batch_images = torch.stack(images).to(DEVICE, dtype=CLIP_DTYPE)
+                        embedding = model.encode_image(batch_images).float()
+                        embedding = embedding / embedding.norm(dim=-1, keepdim=True)
+                    
+                    embeddings[[start + pos for pos in loaded]] = embedding.cpu()
+                except Exception as e:
+                    print(f"  Warning: CLIP embedding failed for frames {start}-{start + len(batch) - 1}: {e}")
     
-    if not embeddings:
-        return torch.zeros((0, 512))
-        
-    return torch.cat(embeddings, dim=0)
+    return embeddings
+
+
+def linkage_labels(embeddings: torch.Tensor) -> list[int]:
+    """Average-linkage cluster labels for L2-normalized embeddings."""
+    # Embeddings are L2-normalized, so cosine distance is one GEMM away
+    distances = (1 - embeddings @ embeddings.T).clamp_(min=0)
+    distances.fill_diagonal_(0)
+    
+    # Average linkage via SciPy's nearest-neighbor-chain implementation
+    tree = linkage(squareform(distances.numpy(), checks=False), method="average")
+    labels = fcluster(tree, t=CLUSTER_DISTANCE_THRESHOLD, criterion="distance")
+    return (labels - 1).tolist()
 
 
 def cluster_frames(embeddings: torch.Tensor) -> list[int]:
-    """Cluster frames by CLIP embedding similarity."""
+    """Cluster frames by CLIP embedding similarity.
+    
+    Linkage is quadratic in frame count, so long recordings cluster an evenly
+    spaced sample of CLUSTER_SAMPLE_CAP frames and assign every frame to the
+    nearest resulting centroid.
+    """
     if len(embeddings) < 2:
         return [0] * len(embeddings)
     
-    clustering = AgglomerativeClustering(
-        n_clusters=None, # type: ignore
-        distance_threshold=CLUSTER_DISTANCE_THRESHOLD,
-        metric="cosine",
-        linkage="average",
-    )
+    if len(embeddings) <= CLUSTER_SAMPLE_CAP:
+        return linkage_labels(embeddings)
     
-    labels = clustering.fit_predict(embeddings.numpy())
-    return labels.tolist()
+    sample = embeddings[torch.linspace(0, len(embeddings) - 1, CLUSTER_SAMPLE_CAP).long()]
+    sample_labels = torch.tensor(linkage_labels(sample))
+    
+    centroids = torch.zeros((int(sample_labels.max()) + 1, embeddings.shape[1]))
+    centroids.index_add_(0, sample_labels, sample)
+    centroids = centroids / centroids.norm(dim=-1, keepdim=True).clamp_(min=1e-12)
+    
+    return (embeddings @ centroids.T).argmax(dim=-1).tolist()
 
 
-def infer_label_with_clip(
-    image_path: Path,
-    model,
-    preprocess,
-    tokenizer,
-) -> str:
-    """Use CLIP zero-shot to classify frame into UI category."""
-    try:
-        image = preprocess(Image.open(image_path)).unsqueeze(0).to(DEVICE)
-        text_tokens = tokenizer(UI_CATEGORIES).to(DEVICE)
-        
-        with torch.no_grad():
-            image_features = model.encode_image(image)
-            text_features = model.encode_text(text_tokens)
-            
-            image_features = image_features / image_features.norm(dim=-1, keepdim=True)
-            text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-            
-            similarity = (100.0 * image_features @ text_features.T).softmax(dim=-1)
-            best_idx = similarity.argmax().item()
-            
-        return CATEGORY_LABELS[best_idx]
-    except Exception as e:
-        print(f"  Warning: Zero-shot classification failed for {image_path.name}: {e}")
-        return "unknown"
+def encode_category_text(model, tokenizer) -> torch.Tensor:
+    """Encode UI_CATEGORIES once as normalized CLIP text features."""
+    text_tokens = tokenizer(UI_CATEGORIES).to(DEVICE)
+    
+    with torch.inference_mode():
+        text_features = model.encode_text(text_tokens).float()
+        text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+    
+    return text_features.cpu()
+
+
+def infer_labels_with_clip(
+    image_embeddings: torch.Tensor,
+    text_features: torch.Tensor,
+) -> list[str]:
+    """Use CLIP zero-shot to classify normalized frame embeddings into UI categories."""
+    best = (image_embeddings @ text_features.T).argmax(dim=-1).tolist()
+    # Zero fallback vectors mark frames that failed to embed in Phase 2
+    embedded = image_embeddings.any(dim=-1).tolist()
+    
+    return [
+        CATEGORY_LABELS[idx] if ok else "unknown"
+        for idx, ok in zip(best, embedded)
+    ]
 
 
 def detect_media_indicators(ocr_text: str) -> list[str]:
@@ -277,9 +414,8 @@ def detect_media_indicators(ocr_text: str) -> list[str]:
 def build_cluster_metadata(
     frames_data: list[FrameData],
     cluster_labels: list[int],
-    model,
-    preprocess,
-    tokenizer,
+    embeddings: torch.Tensor,
+    text_features: torch.Tensor,
 ) -> list[ClusterData]:
     """Build metadata for each cluster."""
     clusters: dict[int, list[FrameData]] = {}
@@ -289,11 +425,16 @@ def build_cluster_metadata(
             clusters[label] = []
         clusters[label].append(frame)
     
+    # Find representatives (middle frame) and label them all in one matmul
+    representatives = [f[len(f) // 2] for f in clusters.values()]
+    labels = infer_labels_with_clip(
+        embeddings[[r["index"] for r in representatives]], text_features
+    )
+    
     result = []
-    for cluster_id, cluster_frames in clusters.items():
-        # Find representative (middle frame)
-        representative = cluster_frames[len(cluster_frames) // 2]
-        
+    for (cluster_id, cluster_frames), representative, label in zip(
+        clusters.items(), representatives, labels
+    ):
         # Compute average OCR characters
         avg_chars = sum(len(f["ocrText"]) for f in cluster_frames) / len(cluster_frames)
         
@@ -306,10 +447,6 @@ def build_cluster_metadata(
         for f in cluster_frames:
             all_indicators.update(detect_media_indicators(f["ocrText"]))
         
-        # Infer label using CLIP on representative
-        rep_path = Path(representative["imagePath"])
-        label = infer_label_with_clip(rep_path, model, preprocess, tokenizer)
-        
         result.append({
             "id": cluster_id,
             "heuristicLabel": label,
@@ -343,7 +480,13 @@ def main():
     print(f"Phase 1: Extracting text with OCR ({args.workers} workers)...")
     ocr_start = time.time()
     
-    ocr_results = extract_ocr_parallel(frames, args.workers)
+    # Consecutive identical frames share one Tesseract pass
+    ocr_sources = find_ocr_sources(frames, args.workers)
+    unique_frames = [f for f in frames if ocr_sources[f[0]] == f[0]]
+    if len(unique_frames) < len(frames):
+        print(f"  Skipping OCR for {len(frames) - len(unique_frames)} repeated frames")
+    
+    ocr_results = extract_ocr_parallel(unique_frames, args.workers)
     
     frames_data: list[FrameData] = []
     for idx, timestamp, path in frames:
@@ -351,7 +494,7 @@ def main():
             "index": idx,
             "timestamp": timestamp,
             "imagePath": str(path),
-            "ocrText": ocr_results.get(idx, ""),
+            "ocrText": ocr_results.get(ocr_sources[idx], ""),
             "clusterId": -1,  # Set later
             "changeScore": 0.0,  # TODO: Implement pixel delta if needed
         })
@@ -367,7 +510,7 @@ def main():
         CLIP_MODEL, pretrained=CLIP_PRETRAINED
     )
     model.eval()
-    model.to(DEVICE)
+    model.to(DEVICE, dtype=CLIP_DTYPE)
     tokenizer = open_clip.get_tokenizer(CLIP_MODEL)
     
     embeddings = compute_clip_embeddings(frames, model, preprocess)
@@ -389,8 +532,9 @@ def main():
     
     # Phase 4: Build cluster metadata
     print("Phase 4: Building cluster metadata...")
+    text_features = encode_category_text(model, tokenizer)
     clusters = build_cluster_metadata(
-        frames_data, cluster_labels, model, preprocess, tokenizer
+        frames_data, cluster_labels, embeddings, text_features
     )
     print(f"  Found {len(clusters)} clusters")
     
@@ -404,8 +548,10 @@ def main():
     }
     
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    with open(args.output, "w") as f:
-        json.dump(result, f, indent=2)
+    if orjson is not None:
+        args.output.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    else:
+        args.output.write_text(json.dumps(result, indent=2))
     
     print(f"\nOutput written to {args.output}")
     print(f"Total processing time: {timing['totalMs']}ms")
@@ -112,6 +112,13 @@ describe('loadConfig', () => {
       const config = loadConfig();
       expect(config.skipLlm).toBe(true);
     });
+
+    it('ESCRIBANO_VLM_AUTOTUNE=true sets vlmAutotune to true', async () => {
+      vi.stubEnv('ESCRIBANO_VLM_AUTOTUNE', 'true');
+      const { loadConfig } = await import('../config.js');
+      const config = loadConfig();
+      expect(config.vlmAutotune).toBe(true);
+    });
   });
 
   describe('backend selection', () => {
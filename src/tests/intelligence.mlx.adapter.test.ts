@@ -2,11 +2,14 @@
  * MLX Intelligence Adapter Tests
  *
  * Tests for Python path detection and auto-venv setup logic used to locate
- * (or create) the correct Python interpreter with mlx-vlm installed.
+ * (or create) the correct Python interpreter with mlx-vlm installed, and for
+ * describeImages batching against a fake bridge process and socket.
  */
 
-import { homedir } from 'node:os';
-import { resolve } from 'node:path';
+import { EventEmitter } from 'node:events';
+import { mkdtemp, rm, writeFile } from 'node:fs/promises';
+import { homedir, tmpdir } from 'node:os';
+import { basename, join, resolve } from 'node:path';
 import { afterEach, beforeEach, describe, expect, it, vi } from 'vitest';
 
 // Mock fs so we can control which paths "exist"
@@ -14,8 +17,28 @@ vi.mock('node:fs', () => ({
   existsSync: vi.fn(() => false),
 }));
 
+// Stand in for the bridge process and its Unix socket
+vi.mock('node:child_process', () => ({
+  spawn: vi.fn(),
+}));
+
+vi.mock('node:net', () => ({
+  createConnection: vi.fn(),
+}));
+
+vi.mock('../config.js', () => ({
+  loadConfig: vi.fn(),
+}));
+
+import { type ChildProcess, spawn } from 'node:child_process';
 import { existsSync } from 'node:fs';
-import { resolvePythonPath } from '../adapters/intelligence.mlx.adapter.js';
+import { createConnection, type Socket } from 'node:net';
+import {
+  cleanupMlxBridge,
+  createMlxIntelligenceService,
+  resolvePythonPath,
+} from '../adapters/intelligence.mlx.adapter.js';
+import { loadConfig } from '../config.js';
 import { getPythonPath } from '../python-utils.js';
 
 // Mock python-deps to control venv behavior
@@ -27,6 +50,9 @@ import { ensureEscribanoVenv as ensurePythonVenv } from '../python-deps.js';
 
 const mockExistsSync = vi.mocked(existsSync);
 const mockEnsurePythonVenv = vi.mocked(ensurePythonVenv);
+const mockSpawn = vi.mocked(spawn);
+const mockCreateConnection = vi.mocked(createConnection);
+const mockLoadConfig = vi.mocked(loadConfig);
 
 // Keys cleared/restored around each test
 const MANAGED_KEYS = [
@@ -154,3 +180,253 @@ describe('resolvePythonPath', () => {
     expect(mockEnsurePythonVenv).toHaveBeenCalledOnce();
   });
 });
+
+/** Config fields the MLX adapter reads. */
+const MLX_TEST_CONFIG = {
+  vlmModel: 'test-vlm',
+  vlmBatchSize: 4,
+  vlmAutotune: false,
+  vlmMaxTokens: 2000,
+  mlxSocketPath: '/tmp/escribano-test.sock',
+  mlxStartupTimeout: 10000,
+};
+
+interface BridgeRequest {
+  imagePaths: string[];
+  prefetchImagePaths: string[];
+  answered: boolean;
+}
+
+/** JSON-lines output describing each image by its file name. */
+function describeFrames(imagePaths: string[]): string {
+  return imagePaths
+    .map((imagePath, i) =>
+      JSON.stringify({
+        frame: i + 1,
+        description: basename(imagePath),
+        activity: 'coding',
+        apps: ['Zed'],
+        topics: ['Rust'],
+      })
+    )
+    .join('\n');
+}
+
+/**
+ * Fake mlx_bridge.py: the spawned process reports ready at once, and each
+ * request written to the socket is answered on the next tick with
+ * `reply(imagePaths)`. Returns the requests in the order they were sent.
+ */
+function fakeBridge(
+  reply: (imagePaths: string[]) => Record<string, unknown> = (imagePaths) => ({
+    text: describeFrames(imagePaths),
+    stats: { peak_memory_gb: 1 },
+  })
+): BridgeRequest[] {
+  const requests: BridgeRequest[] = [];
+
+  mockSpawn.mockImplementation(() => {
+    const child = Object.assign(new EventEmitter(), {
+      stdout: new EventEmitter(),
+      stderr: new EventEmitter(),
+      kill: vi.fn(),
+    });
+    setImmediate(() =>
+      child.stdout.emit('data', Buffer.from('{"status": "ready"}\n'))
+    );
+    return child as unknown as ChildProcess;
+  });
+
+  mockCreateConnection.mockImplementation(() => {
+    const socket = Object.assign(new EventEmitter(), {
+      destroyed: false,
+      destroy: vi.fn(),
+      write: (line: string) => {
+        const { id, params } = JSON.parse(line);
+        const imagePaths: string[] = params.messages[0].content
+          .filter((part: { type: string }) => part.type === 'image')
+          .map((part: { imagePath: string }) => part.imagePath);
+        const request: BridgeRequest = {
+          imagePaths,
+          prefetchImagePaths: params.prefetchImagePaths,
+          answered: false,
+        };
+        requests.push(request);
+        const response = { id, done: true, ...reply(imagePaths) };
+        setImmediate(() => {
+          request.answered = true;
+          socket.emit('data', Buffer.from(`${JSON.stringify(response)}\n`));
+        });
+        return true;
+      },
+    });
+    setImmediate(() => socket.emit('connect'));
+    return socket as unknown as Socket;
+  });
+
+  return requests;
+}
+
+/** Write one frame file per entry; equal contents make identical frames. */
+function writeFrames(
+  dir: string,
+  contents: string[]
+): Promise<Array<{ imagePath: string; timestamp: number }>> {
+  return Promise.all(
+    contents.map(async (content, i) => {
+      const imagePath = join(dir, `frame-${String(i).padStart(2, '0')}.jpg`);
+      await writeFile(imagePath, content);
+      return { imagePath, timestamp: i * 2 };
+    })
+  );
+}
+
+describe('describeImages', () => {
+  let frameDir: string;
+  let savedPythonPath: string | undefined;
+  let logSpy: ReturnType<typeof vi.spyOn>;
+
+  beforeEach(async () => {
+    frameDir = await mkdtemp(join(tmpdir(), 'escribano-mlx-test-'));
+    savedPythonPath = process.env.ESCRIBANO_PYTHON_PATH;
+    process.env.ESCRIBANO_PYTHON_PATH = '/usr/bin/python3';
+    mockLoadConfig.mockReturnValue(
+      MLX_TEST_CONFIG as unknown as ReturnType<typeof loadConfig>
+    );
+    logSpy = vi.spyOn(console, 'log').mockImplementation(() => {});
+  });
+
+  afterEach(async () => {
+    cleanupMlxBridge();
+    if (savedPythonPath === undefined) {
+      delete process.env.ESCRIBANO_PYTHON_PATH;
+    } else {
+      process.env.ESCRIBANO_PYTHON_PATH = savedPythonPath;
+    }
+    mockSpawn.mockReset();
+    mockCreateConnection.mockReset();
+    mockLoadConfig.mockReset();
+    vi.restoreAllMocks();
+    await rm(frameDir, { recursive: true, force: true });
+  });
+
+  it('fans repeated frames out in order with their own index and timestamp', async () => {
+    // Batches of 4 unique frames: [A x3, B, C, D] [E, F x4, G, H] [I]
+    const images = await writeFrames(frameDir, [...'AAABCDEFFFFGHI']);
+    const requests = fakeBridge();
+    const progress: unknown[] = [];
+
+    const service = createMlxIntelligenceService();
+    const results = await service.describeImages(images, {
+      onImageProcessed: (result, { current, total }) => {
+        progress.push({ index: result.index, current, total });
+      },
+    });
+
+    expect(requests.map((r) => r.imagePaths.length)).toEqual([4, 4, 1]);
+    expect(results.map((r) => r.index)).toEqual(images.map((_, i) => i));
+    expect(results.map((r) => r.timestamp)).toEqual(
+      images.map((img) => img.timestamp)
+    );
+    expect(results.map((r) => r.imagePath)).toEqual(
+      images.map((img) => img.imagePath)
+    );
+    // Repeats reuse the description of the first frame in their run
+    const sources = [0, 0, 0, 3, 4, 5, 6, 7, 7, 7, 7, 11, 12, 13];
+    expect(results.map((r) => r.description)).toEqual(
+      sources.map((i) => basename(images[i].imagePath))
+    );
+    // Only frames that went through inference carry its stats
+    const withStats = results.map(
+      (r) => 'vlm_stats' in r && r.vlm_stats !== undefined
+    );
+    expect(withStats).toEqual(sources.map((source, i) => source === i));
+
+    expect(progress).toEqual(
+      images.map((_, i) => ({ index: i, current: i + 1, total: 14 }))
+    );
+    // The second batch takes the count from 6 straight to 13
+    expect(logSpy).toHaveBeenCalledWith('[VLM] [13/14] frames processed');
+    expect(logSpy).toHaveBeenCalledWith('[VLM] [14/14] frames processed');
+  });
+
+  it('sends the next batch before handling the current one', async () => {
+    const images = await writeFrames(frameDir, [...'ABCDEFGH']);
+    const requests = fakeBridge();
+    const sentAtFirstResult: number[] = [];
+
+    const service = createMlxIntelligenceService();
+    await service.describeImages(images, {
+      onImageProcessed: (_result, { current }) => {
+        if (current === 1) sentAtFirstResult.push(requests.length);
+      },
+    });
+
+    expect(sentAtFirstResult).toEqual([2]);
+    expect(requests.map((r) => r.imagePaths)).toEqual([
+      images.slice(0, 4).map((img) => img.imagePath),
+      images.slice(4).map((img) => img.imagePath),
+    ]);
+  });
+
+  it('rethrows a batch error only after the in-flight batch settles', async () => {
+    const images = await writeFrames(frameDir, [...'ABCDEFGH']);
+    let calls = 0;
+    const requests = fakeBridge((imagePaths) =>
+      ++calls === 1
+        ? { text: describeFrames(imagePaths) }
+        : { error: 'bridge busy' }
+    );
+    vi.spyOn(console, 'error').mockImplementation(() => {});
+    const unhandled: unknown[] = [];
+    const onUnhandled = (reason: unknown) => unhandled.push(reason);
+    process.on('unhandledRejection', onUnhandled);
+
+    try {
+      const service = createMlxIntelligenceService();
+      const run = service.describeImages(images, {
+        onImageProcessed: () => {
+          throw new Error('callback failed');
+        },
+      });
+
+      // Batch 1 fails while batch 2 (whose reply is an error) is in flight
+      await expect(run).rejects.toThrow('callback failed');
+      expect(requests).toHaveLength(2);
+      expect(requests.every((r) => r.answered)).toBe(true);
+
+      await new Promise((resolvePromise) => setImmediate(resolvePromise));
+      expect(unhandled).toEqual([]);
+    } finally {
+      process.off('unhandledRejection', onUnhandled);
+    }
+  });
+
+  it('prefetches the images of the batch the autotuner sends next', async () => {
+    mockLoadConfig.mockReturnValue({
+      ...MLX_TEST_CONFIG,
+      vlmAutotune: true,
+    } as unknown as ReturnType<typeof loadConfig>);
+    // Every batch takes one second, so the largest probed size wins
+    let now = 0;
+    vi.spyOn(Date, 'now').mockImplementation(() => now);
+    const images = await writeFrames(frameDir, [...'ABCDEFGHIJKLMNOPQRSTUV']);
+    const requests = fakeBridge((imagePaths) => {
+      now += 1000;
+      return {
+        text: describeFrames(imagePaths),
+        stats: { peak_memory_gb: 1 },
+      };
+    });
+
+    const service = createMlxIntelligenceService();
+    await service.describeImages(images);
+
+    expect(requests.map((r) => r.imagePaths.length)).toEqual([2, 4, 8, 8]);
+    for (let i = 0; i < requests.length; i++) {
+      expect(requests[i].prefetchImagePaths).toEqual(
+        requests[i + 1]?.imagePaths ?? []
+      );
+    }
+  });
+});
@@ -3,6 +3,7 @@
  * Intelligence Adapter Tests
  */
 
+import { readFile } from 'node:fs/promises';
 import { fetch as undiciFetch } from 'undici';
 import { beforeEach, describe, expect, it, vi } from 'vitest';
 import type { IntelligenceConfig, Transcript } from '../0_types.js';
@@ -23,6 +24,10 @@ vi.mock('node:fs', () => ({
   }),
 }));
 
+vi.mock('node:fs/promises', () => ({
+  readFile: vi.fn(async () => Buffer.from('fake-image-data')),
+}));
+
 // Mock undici
 vi.mock('undici', () => ({
   Agent: vi.fn(),
@@ -127,6 +132,31 @@ describe('IntelligenceService', () => {
     expect(result[1].topics).toContain('play');
   });
 
+  it('should re-read an image after a failed prefetch', async () => {
+    vi.mocked(readFile)
+      .mockRejectedValueOnce(new Error('EBUSY'))
+      .mockResolvedValue(Buffer.from('fake-image-data'));
+    mockFetch.mockResolvedValue({
+      ok: true,
+      json: async () => ({
+        message: {
+          content:
+            'description: A cat sitting on a mat | activity: observing | apps: Photos | topics: animals',
+        },
+        done: true,
+        done_reason: 'stop',
+      }),
+    } as any);
+
+    const service = createOllamaIntelligenceService(mockConfig);
+    const result = await service.describeImages([
+      { imagePath: '/path/to/cat.jpg', timestamp: 10 },
+    ]);
+
+    expect(readFile).toHaveBeenCalledTimes(2);
+    expect(result[0].description).toBe('A cat sitting on a mat');
+  });
+
   it('should classify a debugging session', async () => {
     const mockResponse = JSON.stringify({
       message: {
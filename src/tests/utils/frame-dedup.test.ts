@@ -0,0 +1,62 @@
+import { mkdtempSync, rmSync, writeFileSync } from 'node:fs';
+import { tmpdir } from 'node:os';
+import { join } from 'node:path';
+import { afterEach, beforeEach, describe, expect, it } from 'vitest';
+import { collapseRepeatedFrames } from '../../utils/frame-dedup.js';
+
+describe('collapseRepeatedFrames', () => {
+  let dir: string;
+
+  beforeEach(() => {
+    dir = mkdtempSync(join(tmpdir(), 'escribano-frames-'));
+  });
+
+  afterEach(() => {
+    rmSync(dir, { recursive: true, force: true });
+  });
+
+  function frame(name: string, contents: string) {
+    const imagePath = join(dir, name);
+    writeFileSync(imagePath, contents);
+    return { imagePath };
+  }
+
+  it('should group consecutive identical frames behind the first', async () => {
+    const frames = [
+      frame('1.jpg', 'editor'),
+      frame('2.jpg', 'editor'),
+      frame('3.jpg', 'editor'),
+      frame('4.jpg', 'browser'),
+    ];
+
+    const runs = await collapseRepeatedFrames(frames);
+
+    expect(runs).toEqual([
+      { frame: frames[0], repeats: [frames[1], frames[2]] },
+      { frame: frames[3], repeats: [] },
+    ]);
+  });
+
+  it('should not merge identical frames that are not adjacent', async () => {
+    const frames = [
+      frame('1.jpg', 'editor'),
+      frame('2.jpg', 'browser'),
+      frame('3.jpg', 'editor'),
+    ];
+
+    const runs = await collapseRepeatedFrames(frames);
+
+    expect(runs.map((run) => run.frame)).toEqual(frames);
+  });
+
+  it('should never merge unreadable frames', async () => {
+    const frames = [
+      { imagePath: join(dir, 'missing-1.jpg') },
+      { imagePath: join(dir, 'missing-2.jpg') },
+    ];
+
+    const runs = await collapseRepeatedFrames(frames);
+
+    expect(runs).toHaveLength(2);
+  });
+});
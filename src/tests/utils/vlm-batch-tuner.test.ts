@@ -0,0 +1,69 @@
+import { describe, expect, it } from 'vitest';
+import {
+  AUTOTUNE_BATCH_SIZES,
+  createBatchAutotuner,
+} from '../../utils/vlm-batch-tuner.js';
+
+describe('createBatchAutotuner', () => {
+  it('should probe each candidate size in order', () => {
+    const tuner = createBatchAutotuner(2, 16);
+    const seen: number[] = [];
+
+    for (let i = 0; i < AUTOTUNE_BATCH_SIZES.length; i++) {
+      const size = tuner.nextBatchSize();
+      seen.push(size);
+      tuner.record(size, size, 1, 4);
+    }
+
+    expect(seen).toEqual(AUTOTUNE_BATCH_SIZES);
+  });
+
+  it('should settle on the size with the best frames per second', () => {
+    const tuner = createBatchAutotuner(2, 16);
+    tuner.record(2, 2, 2, 4); // 1.0 fps
+    tuner.record(4, 4, 2, 5); // 2.0 fps
+    tuner.record(8, 8, 8, 6); // 1.0 fps
+
+    expect(tuner.nextBatchSize()).toBe(4);
+    tuner.record(4, 4, 100, 5);
+    expect(tuner.nextBatchSize()).toBe(4);
+  });
+
+  it('should only count parsed frames toward throughput', () => {
+    const tuner = createBatchAutotuner(2, 16);
+    tuner.record(2, 2, 2, 4); // 1.0 fps
+    tuner.record(4, 4, 2, 5); // 2.0 fps
+    tuner.record(8, 1, 0.75, 6); // hit the token limit: 1.3 fps, not 10.7
+
+    expect(tuner.nextBatchSize()).toBe(4);
+  });
+
+  it('should report the size after the next one for prefetching', () => {
+    const tuner = createBatchAutotuner(2, 16);
+    const following: number[] = [];
+
+    for (let i = 0; i < 4; i++) {
+      const size = tuner.nextBatchSize();
+      following.push(tuner.followingBatchSize());
+      tuner.record(size, size, size === 4 ? 1 : 4, 4);
+    }
+
+    // Probes 2 and 4, then assumes the largest while 8 runs; 4 wins
+    expect(following).toEqual([4, 8, 8, 4]);
+  });
+
+  it('should stop probing once peak memory reaches the cap', () => {
+    const tuner = createBatchAutotuner(2, 8);
+    tuner.record(2, 2, 2, 4);
+    tuner.record(4, 4, 1, 9);
+
+    expect(tuner.nextBatchSize()).toBe(2);
+  });
+
+  it('should ignore batches that do not match the probed size', () => {
+    const tuner = createBatchAutotuner(2, 16);
+    tuner.record(1, 1, 0.1, 1);
+
+    expect(tuner.nextBatchSize()).toBe(AUTOTUNE_BATCH_SIZES[0]);
+  });
+});
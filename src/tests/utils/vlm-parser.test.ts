@@ -0,0 +1,252 @@
+import { describe, expect, it } from 'vitest';
+import { parseInterleavedOutput } from '../../utils/vlm-parser.js';
+
+describe('parseInterleavedOutput', () => {
+  it('should parse every frame of a well-formed batch', () => {
+    const raw = [
+      'Frame 1: description: Fixing a bug | activity: debugging | apps: [VS Code, Chrome] | topics: [TypeScript, API]',
+      'Frame 2: description: Reading docs | activity: reading | apps: [Chrome] | topics: [Qwen3-VL]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results).toHaveLength(2);
+    expect(results[0]).toMatchObject({
+      index: 0,
+      description: 'Fixing a bug',
+      activity: 'debugging',
+      apps: ['VS Code', 'Chrome'],
+      topics: ['TypeScript', 'API'],
+    });
+    expect(results[1]).toMatchObject({
+      index: 1,
+      description: 'Reading docs',
+      activity: 'reading',
+      apps: ['Chrome'],
+      topics: ['Qwen3-VL'],
+    });
+  });
+
+  it('should parse JSON-lines output', () => {
+    const raw = [
+      '```json',
+      '{"frame": 1, "description": "Fixing a bug", "activity": "debugging", "apps": ["VS Code", "Chrome"], "topics": ["TypeScript"]}',
+      '{"frame": 2, "description": "Reading docs", "activity": "reading", "apps": "[Chrome]", "topics": []}',
+      '```',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0]).toMatchObject({
+      description: 'Fixing a bug',
+      activity: 'debugging',
+      apps: ['VS Code', 'Chrome'],
+      topics: ['TypeScript'],
+    });
+    expect(results[1]).toMatchObject({
+      description: 'Reading docs',
+      apps: ['Chrome'],
+      topics: [],
+    });
+  });
+
+  it('should keep commas inside JSON list items', () => {
+    const raw =
+      '{"frame": 1, "description": "Reviewing", "activity": "reading", "apps": ["Zed, Inc", " Chrome ", "Chrome", ""], "topics": ["\'Rust\'"]}';
+
+    const [result] = parseInterleavedOutput(raw, 1);
+
+    expect(result.apps).toEqual(['Zed, Inc', 'Chrome']);
+    expect(result.topics).toEqual(['Rust']);
+  });
+
+  it('should fill frames missing from JSON output with the legacy format', () => {
+    const raw = [
+      '{"frame": 1, "description": "First", "activity": "coding", "apps": ["Zed"], "topics": ["Rust"]}',
+      'Frame 2: description: Second | activity: terminal | apps: [iTerm] | topics: [git]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0].description).toBe('First');
+    expect(results[1]).toMatchObject({
+      description: 'Second',
+      apps: ['iTerm'],
+    });
+  });
+
+  it('should match frames regardless of output order', () => {
+    const raw = [
+      'Frame 2: description: Second | activity: coding | apps: [Zed] | topics: [Rust]',
+      'Frame 1: description: First | activity: terminal | apps: [iTerm] | topics: [git]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0].description).toBe('First');
+    expect(results[1].description).toBe('Second');
+  });
+
+  it('should not let a malformed record swallow the next frame', () => {
+    const raw = [
+      'Frame 1: description: Missing its fields',
+      'Frame 2: description: Second | activity: coding | apps: [Zed] | topics: [Rust]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0].description).toBe('Failed to parse Frame 1');
+    expect(results[1]).toMatchObject({
+      description: 'Second',
+      activity: 'coding',
+      topics: ['Rust'],
+    });
+  });
+
+  it('should keep a "Frame N:" inside a description in its record', () => {
+    const raw = [
+      'Frame 1: description: The user types "Frame 2: foo" into Slack | activity: chatting | apps: [Slack] | topics: [x]',
+      'Frame 2: description: Second | activity: coding | apps: [Zed] | topics: [Rust]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0]).toMatchObject({
+      description: 'The user types "Frame 2: foo" into Slack',
+      activity: 'chatting',
+      apps: ['Slack'],
+      topics: ['x'],
+    });
+    expect(results[1].description).toBe('Second');
+  });
+
+  it('should parse lowercase frame headers', () => {
+    const raw = [
+      'frame 1: description: First | activity: coding | apps: [Zed] | topics: [Rust]',
+      'frame 2: description: Second | activity: terminal | apps: [iTerm] | topics: [git]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0]).toMatchObject({
+      description: 'First',
+      topics: ['Rust'],
+    });
+    expect(results[1]).toMatchObject({
+      description: 'Second',
+      topics: ['git'],
+    });
+  });
+
+  it('should parse bulleted frame headers', () => {
+    const raw = [
+      '- Frame 1: description: First | activity: coding | apps: [Zed] | topics: [Rust]',
+      '* Frame 2: description: Second | activity: terminal | apps: [iTerm] | topics: [git]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0]).toMatchObject({
+      description: 'First',
+      topics: ['Rust'],
+    });
+    expect(results[1]).toMatchObject({
+      description: 'Second',
+      topics: ['git'],
+    });
+  });
+
+  it('should parse indented frame headers', () => {
+    const raw = [
+      '  Frame 1: description: First | activity: coding | apps: [Zed] | topics: [Rust]',
+      '\tFrame 2: description: Second | activity: terminal | apps: [iTerm] | topics: [git]',
+    ].join('\n');
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0]).toMatchObject({
+      description: 'First',
+      topics: ['Rust'],
+    });
+    expect(results[1]).toMatchObject({
+      description: 'Second',
+      topics: ['git'],
+    });
+  });
+
+  it('should parse several records on one line', () => {
+    const raw =
+      'Frame 1: description: First | activity: coding | apps: [Zed] | topics: [Rust] Frame 2: description: Second | activity: terminal | apps: [iTerm] | topics: [git]';
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0]).toMatchObject({
+      description: 'First',
+      topics: ['Rust'],
+    });
+    expect(results[1]).toMatchObject({
+      description: 'Second',
+      topics: ['git'],
+    });
+  });
+
+  it('should drop repeated apps and topics while keeping order', () => {
+    const raw =
+      'Frame 1: description: Editing | activity: coding | apps: [Zed, Chrome, Zed] | topics: [Rust, WASM, Rust, ]';
+
+    const [result] = parseInterleavedOutput(raw, 1);
+
+    expect(result.apps).toEqual(['Zed', 'Chrome']);
+    expect(result.topics).toEqual(['Rust', 'WASM']);
+  });
+
+  it('should strip quotes from list items', () => {
+    const raw =
+      'Frame 1: description: Editing | activity: coding | apps: ["VS Code", \'Chrome\'] | topics: ["Rust"]';
+
+    const [result] = parseInterleavedOutput(raw, 1);
+
+    expect(result.apps).toEqual(['VS Code', 'Chrome']);
+    expect(result.topics).toEqual(['Rust']);
+  });
+
+  it('should fall back for frames missing from the output', () => {
+    const raw =
+      'Frame 1: description: Only one | activity: coding | apps: [Zed] | topics: [Rust]';
+
+    const results = parseInterleavedOutput(raw, 2);
+
+    expect(results[0].description).toBe('Only one');
+    expect(results[1]).toMatchObject({
+      description: 'Failed to parse Frame 2',
+      activity: 'unknown',
+      apps: [],
+      topics: [],
+    });
+  });
+
+  it('should store the full raw output only on the first failed frame', () => {
+    const raw = `Garbled output ${'x'.repeat(1000)}`;
+
+    const results = parseInterleavedOutput(raw, 3);
+
+    expect(results[0].raw_response).toBe(raw);
+    expect(results[1].raw_response).toBe(raw.slice(0, 512));
+    expect(results[2].raw_response).toBe(raw.slice(0, 512));
+  });
+
+  it('should carry batch metadata onto parsed frames', () => {
+    const raw =
+      'Frame 1: description: Editing | activity: coding | apps: [Zed] | topics: [Rust]';
+
+    const [result] = parseInterleavedOutput(raw, 1, [
+      { index: 7, timestamp: 42, imagePath: '/tmp/frame.jpg' },
+    ]);
+
+    expect(result).toMatchObject({
+      index: 7,
+      timestamp: 42,
+      imagePath: '/tmp/frame.jpg',
+    });
+  });
+});
@@ -0,0 +1,53 @@
+/**
+ * Repeated Frame Collapsing
+ *
+ * Screen recordings often sit on the same screen for several samples in a
+ * row. Frames whose image bytes match the previous frame are grouped behind
+ * it, so the VLM only describes each run once.
+ */
+
+import { createHash } from 'node:crypto';
+import { readFile } from 'node:fs/promises';
+import { parallelMap } from './parallel.js';
+
+const HASH_CONCURRENCY = 16;
+
+export interface FrameRun<T> {
+  /** Frame that is sent to the VLM */
+  frame: T;
+  /** Following frames with byte-identical images */
+  repeats: T[];
+}
+
+async function imageKey(imagePath: string): Promise<string | null> {
+  try {
+    const bytes = await readFile(imagePath);
+    return `${bytes.length}:${createHash('sha1').update(bytes).digest('hex')}`;
+  } catch {
+    // Unreadable frames are never merged; the bridge reports the error
+    return null;
+  }
+}
+
+/**
+ * Group consecutive frames with identical image files, preserving order.
+ */
+export async function collapseRepeatedFrames<T extends { imagePath: string }>(
+  frames: T[]
+): Promise<FrameRun<T>[]> {
+  const keys = await parallelMap(
+    frames,
+    (frame) => imageKey(frame.imagePath),
+    HASH_CONCURRENCY
+  );
+
+  const runs: FrameRun<T>[] = [];
+  for (let i = 0; i < frames.length; i++) {
+    if (runs.length > 0 && keys[i] !== null && keys[i] === keys[i - 1]) {
+      runs[runs.length - 1].repeats.push(frames[i]);
+    } else {
+      runs.push({ frame: frames[i], repeats: [] });
+    }
+  }
+  return runs;
+}
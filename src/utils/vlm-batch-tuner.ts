@@ -0,0 +1,95 @@
+/**
+ * VLM Batch Size Autotuner
+ *
+ * Throughput is not monotonic in batch size, so the first batches of a run
+ * probe a few sizes and the rest of the run uses the fastest one whose peak
+ * memory stayed under the cap.
+ */
+
+export const AUTOTUNE_BATCH_SIZES = [2, 4, 8];
+
+interface BatchProbe {
+  batchSize: number;
+  framesPerSecond: number;
+  peakMemoryGb: number;
+}
+
+export interface BatchAutotuner {
+  /** Batch size to use for the next batch. */
+  nextBatchSize(): number;
+  /**
+   * Likely size of the batch after the next one, so its images can be
+   * prefetched while the next one generates. While the last candidate is
+   * probed the choice is unknown, so the largest candidate is assumed.
+   */
+  followingBatchSize(): number;
+  /**
+   * Record a completed batch. Ignored once a size has been chosen.
+   * Only frames that parsed count toward throughput, so a batch cut short by
+   * the token limit doesn't look faster than it was.
+   */
+  record(
+    batchSize: number,
+    parsedFrames: number,
+    elapsedSeconds: number,
+    peakMemoryGb: number
+  ): void;
+}
+
+export function createBatchAutotuner(
+  fallbackBatchSize: number,
+  memoryCapGb: number
+): BatchAutotuner {
+  const probes: BatchProbe[] = [];
+  let chosen: number | null = null;
+
+  function choose(): number {
+    let best: BatchProbe | null = null;
+    for (const probe of probes) {
+      if (probe.peakMemoryGb >= memoryCapGb) continue;
+      if (!best || probe.framesPerSecond > best.framesPerSecond) {
+        best = probe;
+      }
+    }
+    return best?.batchSize ?? Math.min(fallbackBatchSize, probes[0].batchSize);
+  }
+
+  return {
+    nextBatchSize() {
+      return chosen ?? AUTOTUNE_BATCH_SIZES[probes.length];
+    },
+
+    followingBatchSize() {
+      return (
+        chosen ??
+        AUTOTUNE_BATCH_SIZES[
+          Math.min(probes.length + 1, AUTOTUNE_BATCH_SIZES.length - 1)
+        ]
+      );
+    },
+
+    record(batchSize, parsedFrames, elapsedSeconds, peakMemoryGb) {
+      // Short tail batches say nothing about the probed size
+      if (
+        chosen !== null ||
+        batchSize !== AUTOTUNE_BATCH_SIZES[probes.length]
+      ) {
+        return;
+      }
+
+      probes.push({
+        batchSize,
+        framesPerSecond: parsedFrames / Math.max(elapsedSeconds, 1e-3),
+        peakMemoryGb,
+      });
+
+      // Larger sizes only need more memory, so stop probing at the cap
+      if (
+        probes.length === AUTOTUNE_BATCH_SIZES.length ||
+        peakMemoryGb >= memoryCapGb
+      ) {
+        chosen = choose();
+      }
+    },
+  };
+}
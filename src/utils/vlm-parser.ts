@@ -1,7 +1,8 @@
 /**
  * Shared VLM output parser utilities.
- * Intended for adoption by adapter files in a future cleanup pass.
- * The parseInterleavedOutput logic mirrors intelligence.mlx.adapter.ts.
+ * Used by the MLX adapter for interleaved batch output; the list helpers are
+ * shared with the Ollama adapter. All patterns are compiled once at module
+ * load.
  */
 
 /**
@@ -36,9 +37,142 @@ export function stripThinkingTags(text: string): string {
   return result.trim();
 }
 
+/**
+ * Only the first unparsed frame of a batch stores the full model output;
+ * later ones keep a prefix so a bad batch isn't written to the DB N times.
+ */
+const RAW_RESPONSE_PREVIEW_CHARS = 512;
+
+/**
+ * Trim a list field and drop its surrounding "[" / "]".
+ * Trimming first matters: a record ending in "]\n" kept its bracket before.
+ */
+export function stripBrackets(value: string): string {
+  let s = value.trim();
+  if (s.startsWith('[')) s = s.slice(1);
+  if (s.endsWith(']')) s = s.slice(0, -1);
+  return s.trim();
+}
+
+/**
+ * Splits output in front of each line-leading "Frame N:" header (any case,
+ * optionally indented or bulleted), so records on separate lines land in
+ * separate chunks. A "Frame N:" inside a description (quoted chat, a slide
+ * title) stays part of its record.
+ */
+const FRAME_BOUNDARY = /(?=^[ \t]*(?:[-*][ \t]*)?Frame \d+:)/im;
+
+/**
+ * Matches one "Frame N: description: ..." record at the start of a chunk.
+ * Group 1 is the frame number, then description, activity, apps, topics.
+ * Topics stop at the next "Frame N:" header, so records sharing a line are
+ * matched one after another.
+ */
+const FRAME_RECORD_PATTERN =
+  /^\s*(?:[-*]\s*)?Frame (\d+):\s*description:\s*(.+?)\s*\|\s*activity:\s*(.+?)\s*\|\s*apps:\s*(\[.+?\]|[^|]+)\s*\|\s*topics:\s*(.+?)\s*(?=(?:[-*]\s*)?Frame \d+:|$)/is;
+
+/**
+ * Comma plus surrounding whitespace and quotes, so splitting also trims the
+ * items (models often write apps: ["Chrome", "Zed"]).
+ */
+const LIST_SEPARATOR = /["']?\s*,\s*["']?/;
+const LIST_EDGE_QUOTES = /^["']|["']$/g;
+
+/**
+ * Split a comma-separated list, dropping blanks and repeats (first one wins).
+ */
+export function splitList(value: string): string[] {
+  const items = value
+    .trim()
+    .replace(LIST_EDGE_QUOTES, '')
+    .split(LIST_SEPARATOR);
+  return [...new Set(items.filter(Boolean))];
+}
+
+/**
+ * Index frame records by frame number, matching each header chunk in turn.
+ * Returns match arrays with the description at [1].
+ */
+function matchFrames(text: string): Map<number, string[]> {
+  const found = new Map<number, string[]>();
+  for (const chunk of text.split(FRAME_BOUNDARY)) {
+    let rest = chunk;
+    let m = rest.match(FRAME_RECORD_PATTERN);
+    while (m) {
+      const frameNum = Number(m[1]);
+      if (!found.has(frameNum)) {
+        found.set(frameNum, [m[0], m[2], m[3], m[4], m[5]]);
+      }
+      rest = rest.slice(m[0].length);
+      m = rest.match(FRAME_RECORD_PATTERN);
+    }
+  }
+  return found;
+}
+
+type FrameFields = Pick<
+  ParsedFrame,
+  'description' | 'activity' | 'apps' | 'topics'
+>;
+
+/**
+ * Normalize a JSON list field; tolerates a bracketed string in its place.
+ */
+function toList(value: unknown): string[] {
+  if (Array.isArray(value)) {
+    // Items are already separated; only clean them, never re-split on commas
+    const items = value.map((item) =>
+      String(item).trim().replace(LIST_EDGE_QUOTES, '').trim()
+    );
+    return [...new Set(items.filter(Boolean))];
+  }
+  return typeof value === 'string' ? splitList(stripBrackets(value)) : [];
+}
+
+/**
+ * Collect JSON-lines records ({"frame": N, "description": ...}) by frame.
+ * Lines that are not such an object (code fences, chatter) are skipped.
+ */
+function matchJsonFrames(text: string): Map<number, FrameFields> {
+  const found = new Map<number, FrameFields>();
+  for (const line of text.split('\n')) {
+    const start = line.indexOf('{');
+    const end = line.lastIndexOf('}');
+    if (start < 0 || end < start) continue;
+
+    let record: Record<string, unknown>;
+    try {
+      record = JSON.parse(line.slice(start, end + 1));
+    } catch {
+      continue;
+    }
+
+    const frameNum = Number(record?.frame);
+    if (
+      !Number.isInteger(frameNum) ||
+      typeof record.description !== 'string' ||
+      found.has(frameNum)
+    ) {
+      continue;
+    }
+
+    found.set(frameNum, {
+      description: record.description.trim(),
+      activity:
+        typeof record.activity === 'string'
+          ? record.activity.trim()
+          : 'unknown',
+      apps: toList(record.apps),
+      topics: toList(record.topics),
+    });
+  }
+  return found;
+}
+
 /**
  * Parse interleaved multi-frame VLM output.
- * Handles the pipe-delimited format returned by MLX-VLM.
+ * Reads the JSON-lines format requested by prompts/vlm-batch.md, falling back
+ * to the older pipe-delimited "Frame N: description: ..." format per frame.
  *
  * @param rawText - Raw text output from the VLM model
  * @param expectedFrameCount - Number of frames expected in the output
@@ -50,18 +184,31 @@ export function parseInterleavedOutput(
   batch?: Array<{ index: number; timestamp?: number; imagePath?: string }>
 ): ParsedFrame[] {
   const results: ParsedFrame[] = [];
+  const jsonFrames = matchJsonFrames(rawText);
+  // Only pay for the regex scan when some frame is missing from the JSON
+  const found =
+    jsonFrames.size < expectedFrameCount ? matchFrames(rawText) : null;
+
+  let rawResponseStored = false;
 
   for (let frameNum = 1; frameNum <= expectedFrameCount; frameNum++) {
-    // Look for "Frame N: description: ..." pattern
-    const pattern = new RegExp(
-      `Frame ${frameNum}:\\s*description:\\s*(.+?)\\s*\\|\\s*activity:\\s*(.+?)\\s*\\|\\s*apps:\\s*(\\[.+?\\]|[^|]+)\\s*\\|\\s*topics:\\s*(.+?)(?=Frame \\d+:|$)`,
-      'is'
-    );
-    const match = rawText.match(pattern);
+    const record = jsonFrames.get(frameNum);
+    if (record) {
+      const batchEntry = batch?.[frameNum - 1];
+      results.push({
+        index: batchEntry?.index ?? frameNum - 1,
+        timestamp: batchEntry?.timestamp,
+        imagePath: batchEntry?.imagePath,
+        ...record,
+      });
+      continue;
+    }
+
+    const match = found?.get(frameNum);
 
     if (match) {
-      const appsStr = match[3].replace(/^\[|\]$/g, '').trim();
-      const topicsStr = match[4].replace(/^\[|\]$/g, '').trim();
+      const appsStr = stripBrackets(match[3]);
+      const topicsStr = stripBrackets(match[4]);
 
       const batchEntry = batch?.[frameNum - 1];
       results.push({
@@ -70,14 +217,8 @@ export function parseInterleavedOutput(
         imagePath: batchEntry?.imagePath,
         description: match[1].trim(),
         activity: match[2].trim(),
-        apps: appsStr
-          .split(',')
-          .map((s) => s.trim())
-          .filter(Boolean),
-        topics: topicsStr
-          .split(',')
-          .map((s) => s.trim())
-          .filter(Boolean),
+        apps: splitList(appsStr),
+        topics: splitList(topicsStr),
       });
     } else {
       const batchEntry = batch?.[frameNum - 1];
@@ -89,8 +230,11 @@ export function parseInterleavedOutput(
         activity: 'unknown',
         apps: [],
         topics: [],
-        raw_response: rawText,
+        raw_response: rawResponseStored
+          ? rawText.slice(0, RAW_RESPONSE_PREVIEW_CHARS)
+          : rawText,
       });
+      rawResponseStored = true;
     }
   }
 